@@ -9,7 +9,6 @@ from app.schemas.room import (
     CreateRoomRequest,
     CreateRoomResponse,
     Bot as SchemaBot,
-    Persona as SchemaPersona,
 )
 from app.events.bus import EventBus
 from app.services.bot_spawner import generatePersonaPool, AVATAR_EMOJIS
@@ -33,6 +32,9 @@ async def create_room(request: Request, body: CreateRoomRequest) -> CreateRoomRe
     else:
         rm.set_duration_seconds(room_id, int(getattr(body, "durationSeconds") or 0))
     bots_api: list[SchemaBot] = []
+    # This worker holds the room's bots: route its transcript chunks here
+    # (alongside the workers holding its sockets) so reactions run
+    await request.app.state.event_bus.claim_room(room_id, role="state")
 
     # Create bots using a single AI-generated persona pool
     num_bots = 15
@@ -50,7 +52,7 @@ async def create_room(request: Request, body: CreateRoomRequest) -> CreateRoomRe
         if not isinstance(p, dict):
             raise HTTPException(status_code=500, detail="Invalid persona format from generator.")
         try:
-            persona_model = BotPersona(**p)
+            persona_model = BotPersona.from_dict(p)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Invalid persona data: {e}")
 
@@ -59,16 +61,7 @@ async def create_room(request: Request, body: CreateRoomRequest) -> CreateRoomRe
         new_bot_instance = ServiceBot(avatar=avatar, personality=persona_model, state=BotState())
         request.app.state.room_manager.add_bot_to_room(room_id, new_bot_instance)
 
-        bot_for_api = SchemaBot(
-            id=new_bot_instance.id,
-            name=new_bot_instance.personality.name,
-            avatar=new_bot_instance.avatar,
-            persona=SchemaPersona(
-                stance=new_bot_instance.personality.stance,
-                domain=new_bot_instance.personality.domain,
-                description=new_bot_instance.personality.description,
-            ),
-        )
+        bot_for_api = new_bot_instance.to_schema()
         bots_api.append(bot_for_api)
         # Log and notify via event bus
         print(f"[rooms] bot joined room={room_id} bot={bot_for_api.model_dump()}")
@@ -12,6 +12,54 @@ class Settings(BaseModel):
     cors_origins: List[str] = []
     deepgram_api_key: str | None = None
     openrouter_api_key: str | None = None
+    # Seed for per-room reaction RNGs (unset: nondeterministic); see scripts/replay_transcript.py
+    reaction_seed: int | None = None
+    # Ring-buffer capacity of each bot's history (memory, recent emojis/phrases, engagement)
+    bot_history_size: int = 32
+    # Event bus: per-subscriber queue bound and overflow policy (block | drop_oldest | coalesce)
+    event_bus_queue_max: int = 1024
+    event_bus_overflow: str = "block"
+    # Cross-worker bus transport: "" (single process) | local | redis
+    bus_transport: str = ""
+    redis_url: str | None = None
+    bus_worker_id: str | None = None
+    # Seconds a worker's room claim lives in Redis without a heartbeat
+    bus_claim_ttl_s: float = 15.0
+    # Reaction frames are batched per room over this tick (0 sends each immediately)
+    ws_batch_tick_ms: float = 50.0
+    # Per-connection outbound queue (frames) and how long a client may stay over it
+    ws_max_queue: int = 256
+    ws_evict_after_s: float = 5.0
+    # Stage-2 reaction backend: remote | local | mock (see reaction_backends.py)
+    reaction_backend: str = "remote"
+    reaction_mock_latency_s: float = 0.0
+    # Reaction scheduling: delivery window per chunk and LLM concurrency caps
+    reaction_window_s: float = 3.0
+    llm_max_concurrency: int = 32
+    llm_room_concurrency: int = 4
+    # LLM admission: request/token budgets (0 disables) and per-class queue limits
+    llm_rps: float = 0.0
+    llm_tpm: float = 0.0
+    llm_reaction_max_queue: int = 64
+    llm_persona_max_queue: int = 16
+    # Per-room reaction worker queue: merge | latest | fifo, fifo's bound and
+    # merge's cap on the merged chunk text (the tail is kept)
+    reaction_queue_policy: str = "merge"
+    reaction_queue_max: int = 4
+    reaction_queue_max_chars: int = 1000
+    # Ask for all escalating bots' reactions in one structured LLM call per chunk
+    reaction_batch_mode: bool = False
+    # Hedged stage 2: publish stage 1 after this LLM latency quantile (<= 0 disables)
+    reaction_hedge_quantile: float = 0.5
+    reaction_hedge_min_s: float = 1.0
+    reaction_hedge_late: str = "replace"
+    # Stream stage-2 completions; emoji goes out early as `reaction_partial` (opt-in per socket)
+    reaction_partial_events: bool = True
+    # Stage-2 response cache (normalized chunk + stance/domain)
+    reaction_cache_entries: int = 1024
+    reaction_cache_ttl_s: float = 900.0
+    reaction_cache_max_bytes: int = 1_000_000
+    reaction_cache_key_on_persona: bool = False
 
 
 @lru_cache
@@ -26,6 +74,38 @@ def get_settings() -> Settings:
         cors_origins=origins_list,
         deepgram_api_key=os.getenv("DEEPGRAM_API_KEY"),
         openrouter_api_key=os.getenv("OPENROUTER_API_KEY"),
+        reaction_seed=int(os.environ["REACTION_SEED"]) if os.getenv("REACTION_SEED") else None,
+        bot_history_size=max(1, int(os.getenv("BOT_HISTORY_SIZE", "32"))),
+        event_bus_queue_max=int(os.getenv("EVENT_BUS_QUEUE_MAX", "1024")),
+        event_bus_overflow=os.getenv("EVENT_BUS_OVERFLOW", "block").lower(),
+        bus_transport=os.getenv("BUS_TRANSPORT", "").lower(),
+        redis_url=os.getenv("REDIS_URL"),
+        bus_worker_id=os.getenv("BUS_WORKER_ID") or None,
+        bus_claim_ttl_s=float(os.getenv("BUS_CLAIM_TTL_S", "15")),
+        ws_batch_tick_ms=float(os.getenv("WS_BATCH_TICK_MS", "50")),
+        ws_max_queue=int(os.getenv("WS_MAX_QUEUE", "256")),
+        ws_evict_after_s=float(os.getenv("WS_EVICT_AFTER_S", "5")),
+        reaction_backend=os.getenv("REACTION_BACKEND", "remote").lower(),
+        reaction_mock_latency_s=float(os.getenv("REACTION_MOCK_LATENCY_S", "0")),
+        reaction_window_s=float(os.getenv("REACTION_WINDOW_S", "3.0")),
+        llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+        llm_room_concurrency=int(os.getenv("LLM_ROOM_CONCURRENCY", "4")),
+        llm_rps=float(os.getenv("LLM_RPS", "0")),
+        llm_tpm=float(os.getenv("LLM_TPM", "0")),
+        llm_reaction_max_queue=int(os.getenv("LLM_REACTION_MAX_QUEUE", "64")),
+        llm_persona_max_queue=int(os.getenv("LLM_PERSONA_MAX_QUEUE", "16")),
+        reaction_queue_policy=os.getenv("REACTION_QUEUE_POLICY", "merge").lower(),
+        reaction_queue_max=int(os.getenv("REACTION_QUEUE_MAX", "4")),
+        reaction_queue_max_chars=int(os.getenv("REACTION_QUEUE_MAX_CHARS", "1000")),
+        reaction_batch_mode=os.getenv("REACTION_BATCH_MODE", "").lower() in ("1", "true", "yes"),
+        reaction_hedge_quantile=float(os.getenv("REACTION_HEDGE_QUANTILE", "0.5")),
+        reaction_hedge_min_s=float(os.getenv("REACTION_HEDGE_MIN_S", "1.0")),
+        reaction_hedge_late=os.getenv("REACTION_HEDGE_LATE", "replace").lower(),
+        reaction_partial_events=os.getenv("REACTION_PARTIAL_EVENTS", "true").lower() in ("1", "true", "yes"),
+        reaction_cache_entries=int(os.getenv("REACTION_CACHE_ENTRIES", "1024")),
+        reaction_cache_ttl_s=float(os.getenv("REACTION_CACHE_TTL_S", "900")),
+        reaction_cache_max_bytes=int(os.getenv("REACTION_CACHE_MAX_BYTES", "1000000")),
+        reaction_cache_key_on_persona=os.getenv("REACTION_CACHE_KEY_ON_PERSONA", "").lower() in ("1", "true", "yes"),
     )
 
 
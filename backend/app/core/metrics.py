@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def quantile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank `q` quantile (0..1) of sorted, non-empty samples.
+
+    Used by the `stats()` of every component for the p50/p95 figures in
+    GET /metrics; callers sort once and pass the same list for each quantile.
+    """
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
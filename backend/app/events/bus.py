@@ -1,40 +1,395 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Callable, Dict, Set, Any, Coroutine, Any as AnyType
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Coroutine, Deque, Dict, Hashable, List, Optional, Sequence, Set, Tuple
 
+from app.core.metrics import quantile
+from app.events.transport import ROUTED_TOPICS, BusTransport, is_routed
 
-AsyncHandler = Callable[[Any], Coroutine[AnyType, AnyType, None]]
+
+AsyncHandler = Callable[[Any], Coroutine[Any, Any, None]]
+CoalesceKey = Callable[[Any], Optional[Hashable]]
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+# Why a worker holds a room: it has the room's WebSockets, or the room's
+# bots and state (it created the room) and so must run its reactions
+ROOM_ROLES = ("sockets", "state")
+
+
+def _handler_name(handler: AsyncHandler) -> str:
+    return getattr(handler, "__qualname__", None) or repr(handler)
+
+
+def room_of(payload: Any) -> Optional[str]:
+    """Partition key of an event: its `roomId` (None for room-less events)."""
+    if isinstance(payload, dict):
+        room_id = payload.get("roomId")
+        return room_id if isinstance(room_id, str) else None
+    return None
+
+
+class _Partition:
+    """One room's slice of a subscription: a bounded queue and its worker.
+
+    Pending events are kept in insertion order. Under the `coalesce` policy a
+    new event replaces a pending one with the same key in place (the newest
+    payload wins, the position in line is kept); events without a key, or
+    arriving when the queue is full with no match, are handled like
+    `drop_oldest`.
+    """
+
+    def __init__(self, sub: "_Subscription", room_id: Optional[str]) -> None:
+        self.sub = sub
+        self.room_id = room_id
+        self.pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.worker: Optional["asyncio.Task[None]"] = None
+        self.has_items = asyncio.Event()
+        self.has_space = asyncio.Event()
+        self.has_space.set()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self._seq = 0
+
+    def _next_key(self) -> Tuple[str, int]:
+        self._seq += 1
+        return ("#", self._seq)
+
+    async def put(self, payload: Any) -> None:
+        sub = self.sub
+        key = sub.key(payload) if sub.key is not None and sub.policy == "coalesce" else None
+        if key is not None and key in self.pending:
+            self.pending[key] = payload
+            sub.coalesced += 1
+            return
+        if sub.policy == "block":
+            while len(self.pending) >= sub.max_queue:
+                self.has_space.clear()
+                await self.has_space.wait()
+        elif len(self.pending) >= sub.max_queue:
+            self.pending.popitem(last=False)
+            sub.dropped += 1
+        self.pending[key if key is not None else self._next_key()] = payload
+        sub.max_depth = max(sub.max_depth, len(self.pending))
+        self.idle.clear()
+        self.has_items.set()
+
+    async def run(self, idle_s: float) -> None:
+        sub = self.sub
+        try:
+            while True:
+                if not self.pending:
+                    self.idle.set()
+                    self.has_items.clear()
+                    try:
+                        await asyncio.wait_for(self.has_items.wait(), timeout=idle_s)
+                    except asyncio.TimeoutError:
+                        if not self.pending:
+                            break
+                    continue
+                _, payload = self.pending.popitem(last=False)
+                self.has_space.set()
+                started = time.perf_counter()
+                try:
+                    await sub.handler(payload)
+                    sub.delivered += 1
+                except Exception as e:
+                    sub.failed += 1
+                    sub.last_error = f"{type(e).__name__}: {e}"
+                    print(
+                        f"[bus] handler error topic={sub.topic_label} handler={sub.name} "
+                        f"room={self.room_id} err={e}"
+                    )
+                finally:
+                    sub.latency.append(time.perf_counter() - started)
+        finally:
+            # Idle (or cancelled): retire; the next event for the room starts a fresh worker
+            if sub.partitions.get(self.room_id) is self:
+                sub.partitions.pop(self.room_id, None)
+
+
+class _Subscription:
+    """One handler: its topics, optional room scope, overflow policy and
+    per-room partitions. Counters and latency cover all partitions."""
+
+    def __init__(
+        self,
+        handler: AsyncHandler,
+        room_id: Optional[str],
+        policy: str,
+        max_queue: int,
+        key: Optional[CoalesceKey],
+        latency_samples: int,
+    ) -> None:
+        self.handler = handler
+        self.name = _handler_name(handler)
+        self.room_id = room_id
+        self.topics: List[str] = []
+        self.policy = policy
+        self.max_queue = max(1, int(max_queue))
+        self.key = key
+        self.partitions: Dict[Optional[str], _Partition] = {}
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.last_error: Optional[str] = None
+        self.latency: Deque[float] = deque(maxlen=latency_samples)
+
+    @property
+    def topic_label(self) -> str:
+        return ",".join(self.topics)
+
+    def stats(self) -> dict:
+        lat = sorted(self.latency)
+        return {
+            "handler": self.name,
+            "topics": list(self.topics),
+            "room": self.room_id,
+            "policy": self.policy,
+            "partitions": len(self.partitions),
+            "queue_depth": sum(len(p.pending) for p in self.partitions.values()),
+            "max_depth": self.max_depth,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "latency_p50_ms": round(1000 * quantile(lat, 0.5), 3) if lat else None,
+            "latency_p95_ms": round(1000 * quantile(lat, 0.95), 3) if lat else None,
+            "latency_max_ms": round(1000 * lat[-1], 3) if lat else None,
+            "last_error": self.last_error,
+        }
 
 
 class EventBus:
-    """Simple in-process pub/sub event bus for a single-process MVP.
+    """In-process pub/sub, partitioned by room, with bounded queues per subscriber.
+
+    - subscribe(topic, handler, ...): register an async handler. Events are
+      partitioned by their `roomId`: each (handler, room) pair has its own
+      queue and worker, so a handler sees one room's events in publish order
+      (FIFO) while different rooms are handled in parallel. Subscribing the
+      same handler to several topics gives one FIFO across those topics
+      (e.g. join before leave). With `room_id`, the handler only receives
+      that room's events (no filtering in the handler)
+    - unsubscribe(topic, handler, room_id=None): remove a handler from a topic
+    - publish(topic, payload): enqueue for every matching handler. What
+      happens when a room's queue is full depends on the subscriber's policy:
+      block (publish waits), drop_oldest, or coalesce (replace a pending
+      event with the same key)
+    - close(): stop accepting events, drain queues, cancel workers
+    - stats(): per-handler queue depth, drops, failures and latency
 
-    - subscribe(topic, handler): register an async handler
-    - unsubscribe(topic, handler): remove a handler
-    - publish(topic, payload): schedule all handlers for that topic
+    Workers start on demand and retire after `idle_s` without events; they
+    are tracked so shutdown can drain them.
+
+    With a `transport` (see app/events/transport.py), routed topics cross
+    processes: an event is dispatched here only if this worker holds the
+    room (or no worker does) and is forwarded to the other workers that
+    hold it. A worker holds a room for its sockets and/or its state (see
+    ROOM_ROLES); `claim_room` / `release_room` maintain that affinity per
+    role and `holds_room_state` tells handlers whether this worker runs the
+    room's reactions. `start()` begins receiving.
     """
 
-    def __init__(self) -> None:
-        self._topic_to_handlers: Dict[str, Set[AsyncHandler]] = {}
+    def __init__(
+        self,
+        max_queue: int = 1024,
+        overflow: str = "block",
+        latency_samples: int = 500,
+        idle_s: float = 60.0,
+        transport: Optional[BusTransport] = None,
+        routed_topics: Sequence[str] = ROUTED_TOPICS,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            print(f"[bus] unknown overflow policy {overflow!r}; using block")
+            overflow = "block"
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.idle_s = idle_s
+        self._latency_samples = latency_samples
+        # (topic, room scope) -> subscriptions; scope None = every room
+        self._subs: Dict[Tuple[str, Optional[str]], List[_Subscription]] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+        self.rejected = 0
+        self.transport = transport
+        self.routed_topics = tuple(routed_topics)
+        self.forwarded = 0
+        self.remote_only = 0
+        # room -> roles this worker holds it for
+        self._room_roles: Dict[str, Set[str]] = {}
+
+    def _all_subs(self) -> List[_Subscription]:
+        seen: Dict[int, _Subscription] = {}
+        for subs in self._subs.values():
+            for sub in subs:
+                seen.setdefault(id(sub), sub)
+        return list(seen.values())
+
+    def subscribe(
+        self,
+        topic: str,
+        handler: AsyncHandler,
+        room_id: Optional[str] = None,
+        overflow: Optional[str] = None,
+        max_queue: Optional[int] = None,
+        coalesce_key: Optional[CoalesceKey] = None,
+    ) -> None:
+        """Register `handler` for `topic` (only `room_id`'s events if given).
+
+        `overflow` / `max_queue` (per room) override the bus defaults;
+        `coalesce_key(payload)` names events that may replace each other
+        under the coalesce policy (None: never coalesced). A handler already
+        subscribed with the same room scope keeps its queues and settings.
+        """
+        sub = next(
+            (s for s in self._all_subs() if s.handler is handler and s.room_id == room_id),
+            None,
+        )
+        if sub is None:
+            policy = overflow or self.overflow
+            if policy not in OVERFLOW_POLICIES:
+                print(f"[bus] unknown overflow policy {policy!r} topic={topic}; using {self.overflow}")
+                policy = self.overflow
+            sub = _Subscription(
+                handler,
+                room_id,
+                policy,
+                max_queue or self.max_queue,
+                coalesce_key,
+                self._latency_samples,
+            )
+        if topic in sub.topics:
+            return
+        sub.topics.append(topic)
+        self._subs.setdefault((topic, room_id), []).append(sub)
+
+    def unsubscribe(self, topic: str, handler: AsyncHandler, room_id: Optional[str] = None) -> None:
+        subs = self._subs.get((topic, room_id))
+        if not subs:
+            return
+        for sub in [s for s in subs if s.handler is handler]:
+            subs.remove(sub)
+            sub.topics.remove(topic)
+            if not sub.topics:
+                # Last topic gone: pending events are dropped
+                for part in list(sub.partitions.values()):
+                    if part.worker is not None:
+                        part.worker.cancel()
+        if not subs:
+            self._subs.pop((topic, room_id), None)
+
+    def _partition(self, sub: _Subscription, room_id: Optional[str]) -> _Partition:
+        part = sub.partitions.get(room_id)
+        if part is None or part.worker is None or part.worker.done():
+            part = _Partition(sub, room_id)
+            sub.partitions[room_id] = part
+            task = asyncio.create_task(part.run(self.idle_s), name=f"bus:{sub.name}:{room_id}")
+            part.worker = task
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return part
+
+    async def start(self) -> None:
+        if self.transport is not None:
+            await self.transport.start(self._dispatch)
 
-    def subscribe(self, topic: str, handler: AsyncHandler) -> None:
-        handlers = self._topic_to_handlers.setdefault(topic, set())
-        handlers.add(handler)
+    async def claim_room(self, room_id: str, role: str = "sockets") -> None:
+        """This worker now holds the room's sockets ("sockets") or its bots
+        and state ("state"); the room's routed events come here."""
+        roles = self._room_roles.setdefault(room_id, set())
+        first = not roles
+        roles.add(role)
+        if first and self.transport is not None:
+            await self.transport.claim_room(room_id)
 
-    def unsubscribe(self, topic: str, handler: AsyncHandler) -> None:
-        handlers = self._topic_to_handlers.get(topic)
-        if not handlers:
+    async def release_room(self, room_id: str, role: str = "sockets") -> None:
+        """This worker no longer holds the room for `role` (e.g. its last
+        socket for the room is gone)."""
+        roles = self._room_roles.get(room_id)
+        if not roles or role not in roles:
             return
-        handlers.discard(handler)
-        if not handlers:
-            self._topic_to_handlers.pop(topic, None)
+        roles.discard(role)
+        if roles:
+            return
+        self._room_roles.pop(room_id, None)
+        if self.transport is not None:
+            await self.transport.release_room(room_id)
+
+    def holds_room_state(self, room_id: str) -> bool:
+        """True if this worker runs the room's reactions: always in a single
+        process, otherwise only where the room's state was claimed."""
+        if self.transport is None:
+            return True
+        return "state" in self._room_roles.get(room_id, ())
 
     async def publish(self, topic: str, payload: Any) -> None:
+        if self._closed:
+            self.rejected += 1
+            return
+        room_id = room_of(payload)
+        transport = self.transport
+        if transport is not None and room_id is not None and is_routed(topic, self.routed_topics):
+            owners = await transport.owners(room_id)
+            others = owners - {transport.worker_id}
+            if others:
+                await transport.send(others, topic, payload)
+                self.forwarded += 1
+            if owners and transport.worker_id not in owners:
+                # The room's sockets are all on other workers
+                self.remote_only += 1
+                return
+        await self._dispatch(topic, payload)
+
+    async def _dispatch(self, topic: str, payload: Any) -> None:
+        """Deliver to this process's subscribers (also used for remote events)."""
+        if self._closed:
+            self.rejected += 1
+            return
+        room_id = room_of(payload)
         # Snapshot to avoid mutation during iteration
-        for handler in list(self._topic_to_handlers.get(topic, set())):
-            # Fire and forget; add proper error logging if needed
-            coro = handler(payload)
-            asyncio.create_task(coro)
+        targets = list(self._subs.get((topic, None), ()))
+        if room_id is not None:
+            targets.extend(self._subs.get((topic, room_id), ()))
+        for sub in targets:
+            await self._partition(sub, room_id).put(payload)
+
+    async def drain(self, timeout_s: float = 5.0) -> bool:
+        """Wait until every queued event has been handled (up to `timeout_s`);
+        False if some are still pending."""
+        parts = [p for sub in self._all_subs() for p in sub.partitions.values()]
+        if not parts:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(p.idle.wait() for p in parts)), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            left = sum(len(p.pending) for p in parts)
+            print(f"[bus] drain timed out; {left} events still queued")
+            return False
+        return True
 
+    async def close(self, timeout_s: float = 5.0) -> None:
+        """Stop accepting events and let workers finish what is queued
+        (up to `timeout_s`), then cancel them."""
+        self._closed = True
+        await self.drain(timeout_s)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.transport is not None:
+            await self.transport.close()
 
+    def stats(self) -> dict:
+        return {
+            "overflow": self.overflow,
+            "max_queue": self.max_queue,
+            "workers": len(self._tasks),
+            "rejected": self.rejected,
+            "forwarded": self.forwarded,
+            "remote_only": self.remote_only,
+            "transport": self.transport.stats() if self.transport is not None else None,
+            "subscribers": [sub.stats() for sub in self._all_subs()],
+        }
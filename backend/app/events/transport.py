@@ -0,0 +1,329 @@
+"""Cross-process transports for the EventBus.
+
+With several uvicorn workers, each process has its own bus, rooms and
+sockets. A transport carries routed events (see `ROUTED_TOPICS`) to the
+workers that hold sockets for the event's room, and tracks that
+room-to-worker affinity:
+
+- A worker claims a room when its first socket for the room connects and
+  releases it when the last one leaves.
+- A routed event is dispatched locally if this worker holds the room (or no
+  worker does), and is sent only to the other workers holding the room. Fan-out
+  stays local whenever the room's viewers are on the publishing worker.
+
+Implementations:
+- LocalTransport: in-process hub, for tests and harnesses that run several
+  buses side by side in one process.
+- RedisStreamsTransport: one Redis stream per worker (XADD / blocking XREAD)
+  and one sorted set per room for affinity, where each worker's membership
+  expires unless it is refreshed. `redis` is imported only when it is
+  selected (pip install redis).
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import fnmatch
+import json
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+
+# Topics that cross workers; room-less events and other topics stay local
+ROUTED_TOPICS = ("transcript:chunk", "bot:*", "coach:feedback")
+
+RemoteHandler = Callable[[str, Any], Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def is_routed(topic: str, patterns: Iterable[str] = ROUTED_TOPICS) -> bool:
+    return any(fnmatch.fnmatchcase(topic, p) for p in patterns)
+
+
+class BusTransport(abc.ABC):
+    """Interface: deliver routed events to other workers and track room affinity."""
+
+    name = "base"
+
+    def __init__(self, worker_id: Optional[str] = None) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self._claimed: Set[str] = set()
+
+    @abc.abstractmethod
+    async def start(self, on_remote: RemoteHandler) -> None:
+        """Begin receiving; `on_remote(topic, payload)` dispatches locally."""
+
+    @abc.abstractmethod
+    async def send(self, worker_ids: Iterable[str], topic: str, payload: Any) -> None:
+        """Deliver an event to each of `worker_ids`."""
+
+    @abc.abstractmethod
+    async def owners(self, room_id: str) -> Set[str]:
+        """Workers currently holding sockets for the room."""
+
+    async def claim_room(self, room_id: str) -> None:
+        self._claimed.add(room_id)
+
+    async def release_room(self, room_id: str) -> None:
+        self._claimed.discard(room_id)
+
+    async def close(self) -> None:
+        for room_id in list(self._claimed):
+            await self.release_room(room_id)
+
+    def stats(self) -> dict:
+        return {
+            "transport": self.name,
+            "worker_id": self.worker_id,
+            "claimed_rooms": len(self._claimed),
+            "sent": self.sent,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+class LocalHub:
+    """Shared state for LocalTransports in one process: inboxes and affinity."""
+
+    def __init__(self) -> None:
+        self.inboxes: Dict[str, "asyncio.Queue[Tuple[str, Any]]"] = {}
+        self.rooms: Dict[str, Set[str]] = {}
+
+
+_default_hub = LocalHub()
+
+
+class LocalTransport(BusTransport):
+    """In-process transport; buses sharing a hub behave like separate workers."""
+
+    name = "local"
+
+    def __init__(self, worker_id: Optional[str] = None, hub: Optional[LocalHub] = None) -> None:
+        super().__init__(worker_id)
+        self.hub = hub or _default_hub
+        self._reader: Optional["asyncio.Task[None]"] = None
+
+    async def start(self, on_remote: RemoteHandler) -> None:
+        inbox: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+        self.hub.inboxes[self.worker_id] = inbox
+
+        async def _read() -> None:
+            while True:
+                topic, payload = await inbox.get()
+                self.received += 1
+                try:
+                    await on_remote(topic, payload)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[bus] remote dispatch error topic={topic} err={e}")
+
+        self._reader = asyncio.create_task(_read(), name=f"bus-transport:{self.worker_id}")
+
+    async def send(self, worker_ids: Iterable[str], topic: str, payload: Any) -> None:
+        # Round-trip through JSON like a real transport would
+        wire = json.loads(json.dumps(payload))
+        for worker_id in worker_ids:
+            inbox = self.hub.inboxes.get(worker_id)
+            if inbox is not None:
+                inbox.put_nowait((topic, wire))
+                self.sent += 1
+
+    async def owners(self, room_id: str) -> Set[str]:
+        return set(self.hub.rooms.get(room_id, ()))
+
+    async def claim_room(self, room_id: str) -> None:
+        await super().claim_room(room_id)
+        self.hub.rooms.setdefault(room_id, set()).add(self.worker_id)
+
+    async def release_room(self, room_id: str) -> None:
+        await super().release_room(room_id)
+        workers = self.hub.rooms.get(room_id)
+        if workers is not None:
+            workers.discard(self.worker_id)
+            if not workers:
+                self.hub.rooms.pop(room_id, None)
+
+    async def close(self) -> None:
+        await super().close()
+        self.hub.inboxes.pop(self.worker_id, None)
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class RedisStreamsTransport(BusTransport):
+    """Redis transport: a stream per worker plus an owner set per room.
+
+    Events go to `{prefix}:stream:{worker}` (capped at `maxlen`), and each
+    worker reads its own stream with a blocking XREAD. Room owners are
+    stored in the sorted set `{prefix}:owners:{room}`, scored by the wall
+    clock time each worker's claim expires. Live workers refresh their
+    claims every `claim_ttl_s / 3`; owners whose claim has expired (a
+    crashed worker) are ignored and pruned, so events for the room are no
+    longer sent to a dead stream. Owner lookups are cached locally for
+    `owners_ttl_s`.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        worker_id: Optional[str] = None,
+        prefix: str = "podium:bus",
+        maxlen: int = 10_000,
+        owners_ttl_s: float = 1.0,
+        claim_ttl_s: float = 15.0,
+    ) -> None:
+        super().__init__(worker_id)
+        try:
+            from redis import asyncio as redis_asyncio  # type: ignore[import-not-found]
+        except ImportError as e:
+            raise RuntimeError("BUS_TRANSPORT=redis requires the redis package (pip install redis)") from e
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.maxlen = maxlen
+        self.owners_ttl_s = owners_ttl_s
+        self.claim_ttl_s = max(1.0, float(claim_ttl_s))
+        self._owners: Dict[str, Tuple[float, Set[str]]] = {}
+        self._reader: Optional["asyncio.Task[None]"] = None
+        self._heartbeat: Optional["asyncio.Task[None]"] = None
+
+    def _stream(self, worker_id: str) -> str:
+        return f"{self.prefix}:stream:{worker_id}"
+
+    def _room_key(self, room_id: str) -> str:
+        return f"{self.prefix}:owners:{room_id}"
+
+    async def _refresh_claim(self, room_id: str) -> None:
+        key = self._room_key(room_id)
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {self.worker_id: now + self.claim_ttl_s})
+            # Drop claims of workers that stopped refreshing
+            pipe.zremrangebyscore(key, "-inf", now)
+            # The whole set goes away once every owner is gone
+            pipe.expire(key, int(self.claim_ttl_s * 2))
+            await pipe.execute()
+
+    async def start(self, on_remote: RemoteHandler) -> None:
+        stream = self._stream(self.worker_id)
+
+        async def _read() -> None:
+            last_id = "$"
+            while True:
+                try:
+                    batches = await self._redis.xread({stream: last_id}, block=1000, count=100)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[bus] redis read error worker={self.worker_id} err={e}")
+                    await asyncio.sleep(1.0)
+                    continue
+                for _, entries in batches or ():
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        self.received += 1
+                        try:
+                            await on_remote(fields["topic"], json.loads(fields["payload"]))
+                        except Exception as e:
+                            self.errors += 1
+                            print(f"[bus] remote dispatch error topic={fields.get('topic')} err={e}")
+
+        async def _beat() -> None:
+            while True:
+                await asyncio.sleep(self.claim_ttl_s / 3)
+                for room_id in list(self._claimed):
+                    try:
+                        await self._refresh_claim(room_id)
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"[bus] redis heartbeat error room={room_id} worker={self.worker_id} err={e}")
+
+        self._reader = asyncio.create_task(_read(), name=f"bus-transport:{self.worker_id}")
+        self._heartbeat = asyncio.create_task(_beat(), name=f"bus-heartbeat:{self.worker_id}")
+
+    async def send(self, worker_ids: Iterable[str], topic: str, payload: Any) -> None:
+        fields = {"topic": topic, "payload": json.dumps(payload, ensure_ascii=False), "origin": self.worker_id}
+        for worker_id in worker_ids:
+            try:
+                await self._redis.xadd(self._stream(worker_id), fields, maxlen=self.maxlen, approximate=True)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[bus] redis send error worker={worker_id} topic={topic} err={e}")
+
+    async def owners(self, room_id: str) -> Set[str]:
+        now = time.monotonic()
+        cached = self._owners.get(room_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        try:
+            # Only unexpired claims count as owners
+            workers = set(await self._redis.zrangebyscore(self._room_key(room_id), time.time(), "+inf"))
+        except Exception as e:
+            self.errors += 1
+            print(f"[bus] redis affinity error room={room_id} err={e}")
+            # Unknown owners: keep the event local
+            workers = set()
+        if room_id in self._claimed:
+            # Our own claim counts even if writing it to Redis failed
+            workers.add(self.worker_id)
+        self._owners[room_id] = (now + self.owners_ttl_s, workers)
+        return workers
+
+    async def claim_room(self, room_id: str) -> None:
+        # Affinity errors are logged, never raised: a Redis outage must not
+        # take down the WebSocket endpoint that claims the room
+        await super().claim_room(room_id)
+        self._owners.pop(room_id, None)
+        try:
+            await self._refresh_claim(room_id)
+        except Exception as e:
+            self.errors += 1
+            print(f"[bus] redis claim error room={room_id} worker={self.worker_id} err={e}")
+
+    async def release_room(self, room_id: str) -> None:
+        await super().release_room(room_id)
+        self._owners.pop(room_id, None)
+        try:
+            await self._redis.zrem(self._room_key(room_id), self.worker_id)
+        except Exception as e:
+            self.errors += 1
+            print(f"[bus] redis release error room={room_id} worker={self.worker_id} err={e}")
+
+    async def close(self) -> None:
+        tasks = [t for t in (self._heartbeat, self._reader) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await super().close()
+        await self._redis.aclose()
+
+
+def create_bus_transport(
+    kind: str,
+    redis_url: Optional[str] = None,
+    worker_id: Optional[str] = None,
+    claim_ttl_s: float = 15.0,
+) -> Optional[BusTransport]:
+    """Transport for BUS_TRANSPORT: "" (single process), "local" or "redis"."""
+    kind = (kind or "").lower()
+    if not kind or kind == "none":
+        return None
+    if kind == "local":
+        return LocalTransport(worker_id)
+    if kind == "redis":
+        return RedisStreamsTransport(redis_url or "redis://localhost:6379/0", worker_id, claim_ttl_s=claim_ttl_s)
+    print(f"[bus] unknown bus transport {kind!r}; running single-process")
+    return None
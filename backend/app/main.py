@@ -1,38 +1,84 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import asyncio
-import random
-import time
-import math
 
 from app.core.config import get_settings
 from app.api.rooms import router as rooms_router
 from app.api.broadcast import router as broadcast_router
 from app.api.events import router as events_router
 from app.ws.manager import ConnectionManager
-from app.ws.routes import router as ws_router
+from app.ws.routes import room_state, router as ws_router
 from app.events.bus import EventBus
+from app.events.transport import create_bus_transport
 from app.api.webhooks import router as webhooks_router
 from app.services.transcript_buffer import TranscriptBuffer
-from app.services.bot import Bot
+from app.services.bot import close_client, llm_metrics
+from app.services.chunk_scoring import get_chunk_scorer
+from app.services.llm_admission import get_llm_admission
+from app.services.reaction_backends import create_reaction_backend, set_reaction_backend
+from app.services.reaction_cache import ReactionCache
+from app.services.reaction_pipeline import DEBUG_EVENT, PARTIAL_EVENT, ReactionPipeline
+from app.services.reaction_scheduler import ReactionScheduler
+from app.services.reaction_worker import ReactionWorkers
 from app.state.room_manager import RoomManager
 from app.core import registry
-from typing import Optional
-from app.services.reaction_config import (
-    STAGE2_TIMEOUT_S,
-    get_phrases,
-    compute_reaction_probability,
-)
-from app.services import reaction_config as rc
 
 app = FastAPI(title="Podium Backend", version="0.1.0")
 
 settings = get_settings()
 app.state.settings = settings
-app.state.ws_manager = ConnectionManager()
-app.state.event_bus = EventBus()
+app.state.ws_manager = ConnectionManager(
+    tick_s=settings.ws_batch_tick_ms / 1000.0,
+    max_queue=settings.ws_max_queue,
+    evict_after_s=settings.ws_evict_after_s,
+)
+app.state.event_bus = EventBus(
+    max_queue=settings.event_bus_queue_max,
+    overflow=settings.event_bus_overflow,
+    transport=create_bus_transport(
+        settings.bus_transport,
+        redis_url=settings.redis_url,
+        worker_id=settings.bus_worker_id,
+        claim_ttl_s=settings.bus_claim_ttl_s,
+    ),
+)
 app.state.transcript_buffer = TranscriptBuffer(max_interval_s=7.0, flush_on_interval=True)
 app.state.room_manager = RoomManager()
+app.state.reaction_backend = create_reaction_backend(
+    settings.reaction_backend, mock_latency_s=settings.reaction_mock_latency_s
+)
+set_reaction_backend(app.state.reaction_backend)
+app.state.llm_admission = get_llm_admission()
+app.state.reaction_scheduler = ReactionScheduler(
+    window_s=settings.reaction_window_s,
+    room_llm_concurrency=settings.llm_room_concurrency,
+    admission=app.state.llm_admission,
+)
+app.state.reaction_cache = ReactionCache(
+    max_entries=settings.reaction_cache_entries,
+    ttl_s=settings.reaction_cache_ttl_s,
+    max_bytes=settings.reaction_cache_max_bytes,
+    key_on_persona=settings.reaction_cache_key_on_persona,
+)
+app.state.reaction_pipeline = ReactionPipeline(
+    app.state.room_manager,
+    app.state.ws_manager,
+    app.state.event_bus,
+    app.state.reaction_scheduler,
+    cache=app.state.reaction_cache,
+    # The audience batch call is remote-only
+    batch_mode=settings.reaction_batch_mode and app.state.reaction_backend.name == "remote",
+    hedge_quantile=settings.reaction_hedge_quantile if settings.reaction_hedge_quantile > 0 else None,
+    hedge_min_s=settings.reaction_hedge_min_s,
+    hedge_late=settings.reaction_hedge_late,
+    partial_events=settings.reaction_partial_events,
+)
+app.state.reaction_workers = ReactionWorkers(
+    app.state.reaction_pipeline,
+    app.state.room_manager,
+    policy=settings.reaction_queue_policy,
+    max_pending=settings.reaction_queue_max,
+    max_chars=settings.reaction_queue_max_chars,
+)
 registry.bind(app)
 
 if settings.cors_origins:
@@ -57,6 +103,34 @@ else:
 async def health() -> dict[str, str]:
     return {"status": "ok"}
 
+@app.on_event("startup")
+async def _build_keyword_tables() -> None:
+    get_chunk_scorer()
+    app.state.reaction_backend.warm()
+    await app.state.event_bus.start()
+
+@app.on_event("shutdown")
+async def _close_llm_client() -> None:
+    # Drain the bus first so queued chunks and reactions still go out
+    await app.state.event_bus.close()
+    await app.state.reaction_workers.close()
+    await app.state.reaction_pipeline.close()
+    await app.state.ws_manager.close()
+    await app.state.reaction_backend.close()
+    await close_client()
+
+@app.get("/metrics")
+async def metrics() -> dict:
+    return {
+        "reactions": app.state.reaction_scheduler.stats(),
+        "reaction_workers": app.state.reaction_workers.stats(),
+        "ws": app.state.ws_manager.stats(),
+        "event_bus": app.state.event_bus.stats(),
+        "llm": llm_metrics.snapshot(),
+        "llm_admission": app.state.llm_admission.stats(),
+        "reaction_cache": app.state.reaction_cache.stats(),
+    }
+
 app.include_router(rooms_router)
 app.include_router(broadcast_router)
 app.include_router(events_router)
@@ -68,12 +142,44 @@ async def _on_bot_reaction(payload: dict) -> None:
     if not room_id:
         return
     print(f"[ws] broadcasting reaction room={room_id} bot={payload.get('botId')}")
-    await app.state.ws_manager.broadcast_json(
+    await app.state.ws_manager.broadcast_batched(
         room_id,
         {"event": "reaction", "payload": payload},
     )
 
-app.state.event_bus.subscribe("bot:reaction", _on_bot_reaction)
+# Under overload a newer reaction from the same bot replaces its pending one
+app.state.event_bus.subscribe(
+    "bot:reaction",
+    _on_bot_reaction,
+    overflow="coalesce",
+    coalesce_key=lambda p: (p.get("roomId"), p.get("botId")) if isinstance(p, dict) else None,
+)
+
+async def _on_reaction_partial(payload: dict) -> None:
+    room_id = payload.get("roomId")
+    if not room_id:
+        return
+    await app.state.ws_manager.broadcast_json(
+        room_id,
+        {"event": PARTIAL_EVENT, "payload": payload},
+        opt_in=PARTIAL_EVENT,
+    )
+
+async def _on_reaction_debug(payload: dict) -> None:
+    room_id = payload.get("roomId")
+    if not room_id:
+        return
+    await app.state.ws_manager.broadcast_batched(
+        room_id,
+        {"event": DEBUG_EVENT, "payload": payload},
+        opt_in=DEBUG_EVENT,
+    )
+
+# Published on the state-holding worker; sent by whichever workers hold
+# the room's sockets, like bot:reaction. Diagnostics are dropped, oldest
+# first, rather than hold up the pipeline.
+app.state.event_bus.subscribe("bot:reaction_partial", _on_reaction_partial)
+app.state.event_bus.subscribe("bot:reaction_debug", _on_reaction_debug, overflow="drop_oldest")
 
 async def _on_transcript_chunk(payload: dict) -> None:
     room_id = payload.get("roomId")
@@ -81,262 +187,40 @@ async def _on_transcript_chunk(payload: dict) -> None:
     text_chunk = payload.get("text", "")
     flush_meta = payload.get("flush_meta") or {}
 
-    # Get tail context BEFORE appending current chunk to avoid duplication
-    tail_context = app.state.room_manager.get_transcript_tail_chars(room_id, 150)
     await app.state.ws_manager.broadcast_json(
         room_id, {"event": "transcript", "payload": payload}
     )
-
-    bots_in_room = app.state.room_manager.get_service_bots_in_room(room_id)
-
-    async def stage1_react(bot: Bot, text: str, fm: dict) -> dict:
-        """Generate a quick, local reaction (Stage-1) without model calls.
-        Simple mapping based on punctuation and keyword hits.
-        """
-        is_question = bool(fm.get("question"))
-        is_exclaim = bool(fm.get("exclaim"))
-
-        cat: Optional[str] = app.state.room_manager.get_category(room_id)
-        stance = bot.personality.stance
-        domain = bot.personality.domain
-
-        # Keyword hit counts from category presets
-        preset = getattr(rc, "CATEGORIES", {}).get(cat or "", {})
-        txt = (text or "").lower()
-        pos_hits = 0
-        neg_hits = 0
-        try:
-            for kw in preset.get("keywords_pos", []):
-                if kw.lower() in txt:
-                    pos_hits += 1
-            for kw in preset.get("keywords_neg", []):
-                if kw.lower() in txt:
-                    neg_hits += 1
-        except Exception:
-            pos_hits = pos_hits
-            neg_hits = neg_hits
-
-        # Bucket selection: prioritize questions, then negatives, else exclaim/positive/neutral
-        if is_question:
-            bucket = "curious"
-        elif neg_hits > pos_hits:
-            bucket = "negative"
-        elif is_exclaim or pos_hits > 0:
-            bucket = "positive"
-        else:
-            bucket = "neutral"
-
-        # Pick an emoji from config
-        emoji_groups = getattr(rc, "EMOJI", {})
-        group = emoji_groups.get({
-            "positive": "pos",
-            "negative": "neg",
-            "curious": "curious",
-            "neutral": "neutral",
-            "anticipation": "neutral",
-        }.get(bucket, "neutral"), ["😐"])  # map to available groups
-        emoji = group[0] if isinstance(group, list) and group else "😐"
-
-        # Choose a short phrase
-        phrases = get_phrases(stance, bucket, domain) or []
-        default_phrase = getattr(rc, "DEFAULT_PHRASE", {}).get(bucket, "")
-        phrase = phrases[random.randint(0, len(phrases) - 1)] if phrases else default_phrase
-
-        
-        await asyncio.sleep(random.uniform(0.2, 2))
-
-        # Stage-1 no longer computes any score delta
-        return {"emoji_unicode": emoji, "micro_phrase": phrase, "score_delta": 0}
-
-    async def generate_and_publish_reactions():
-
-
-        async def one_bot_react(bot, start_delay_s: float = 0.0, leave_delay_s: float = 0.0):
-            # Stagger start to avoid simultaneous reactions
-            if start_delay_s > 0:
-                try:
-                    await asyncio.sleep(start_delay_s)
-                except Exception:
-                    pass
-            try:
-                start = asyncio.get_event_loop().time()
-                stance = bot.personality.stance
-                is_question = bool(flush_meta.get("question"))
-                # suppression: use configured probability to ignore entirely
-                if random.random() < 0.30:
-                    reaction = None
-                else:
-
-                    stage1_used = False
-                    if random.random() < 0.5:
-                        try:
-                            # Include prior transcript tail to provide brief context
-                            stage2_input = f"{tail_context}{text_chunk}"
-                            reaction = await asyncio.wait_for(
-                                bot.generateReaction(stage2_input), timeout=STAGE2_TIMEOUT_S
-                            )
-                            if reaction is None:
-                                reaction = await stage1_react(bot, text_chunk, flush_meta)
-                                stage1_used = True
-                        except Exception:
-                            reaction = await stage1_react(bot, text_chunk, flush_meta)
-                            stage1_used = True
-                    else:
-                        # running supression prob again to increase randomness
-                        if random.random() < 0.65:
-                            reaction = None
-                        else:
-                            reaction = await stage1_react(bot, text_chunk, flush_meta)
-                            stage1_used = True
-
-                cooldown = bot.state.cooldownSeconds
-                prob = compute_reaction_probability(
-                    bot.state.reactionProbability,
-                    stance,
-                )
-            except asyncio.TimeoutError:
-                print(f"[bot] reaction TIMEOUT room={room_id} bot={bot.id}")
-                reaction = {
-                    "emoji_unicode": "⏳",
-                    "micro_phrase": "Thinking",
-                    "score_delta": 0,
-                }
-            except Exception as e:
-                print(f"[bot] reaction ERROR room={room_id} bot={bot.id} err={e}")
-                reaction = {
-                    "emoji_unicode": "❓",
-                    "micro_phrase": "Hmm",
-                    "score_delta": 0,
-                }
-            if reaction:
-                elapsed = asyncio.get_event_loop().time() - start
-                now = time.monotonic()
-                should_react = True
-                try:
-                    last_ts = bot.state.lastReactionTs  # type: ignore[attr-defined]
-
-                    cooldown = bot.state.cooldownSeconds
-                    prob = locals().get('prob', bot.state.reactionProbability)
-
-                    if now - last_ts < cooldown:
-                        should_react = False
-                    elif random.random() > prob:
-                        should_react = False
-                except Exception:
-                    should_react = True
-
-                if should_react:
-                    bot.state.lastReactionTs = now  # type: ignore[attr-defined]
-                    print(f"[bot] publishing reaction room={room_id} bot={bot.id}")
-                    # emit debug events about decision path
-                    await app.state.ws_manager.broadcast_json(
-                        room_id,
-                        {"event": "reaction_debug", "payload": {
-                            "roomId": room_id,
-                            "botId": bot.id,
-                            "decision": {
-                                "is_question": bool(flush_meta.get("question")),
-                                "escalated": bool('stage1_used' in locals() and not stage1_used),
-                                "timeout_s": STAGE2_TIMEOUT_S if ('escalate' in locals() and escalate) else 0,
-                            },
-                            "reaction": reaction,
-                        }}
-                    )
-                    await app.state.event_bus.publish(
-                        "bot:reaction",
-                        {"roomId": room_id, "botId": bot.id, "reaction": reaction},
-                    )
-                    # Update engagement and auto-leave if it drops too low
-                    # Parse and clamp engagement delta from model
-                    def _parse_delta(val):
-                        try:
-                            if isinstance(val, (int, float)):
-                                return int(round(float(val)))
-                            if isinstance(val, str):
-                                return int(round(float(val.strip())))
-                        except Exception:
-                            return 0
-                        return 0
-                    delta = _parse_delta(reaction.get("score_delta", 0))
-                    # Clamp input delta to [-5, 5]
-                    delta = max(-5, min(5, delta))
-                    # Make deductions stricter: amplify negatives slightly
-                    if delta < 0:
-                        # e.g., -1 -> -2, -2 -> -3, -3 -> -4, -4/-5 stay as is
-                        delta = max(-5, delta - 1)
-                    try:
-                        before = float(bot.state.engagementScore)
-                        after = before + float(delta)
-                        # Cap maximum engagement at 10
-                        if after > 10.0:
-                            after = 10.0
-                        bot.state.engagementScore = after
-                        print(f"[bot] engagement update room={room_id} bot={bot.id} delta={delta} score={after:.1f}")
-                    except Exception:
-                        pass
-                    # Threshold for removal
-                    try:
-                        threshold = -10.0
-                        score = float(bot.state.engagementScore)
-                        if score <= threshold:
-                            # Stagger leave to avoid simultaneous exits
-                            if leave_delay_s > 0:
-                                try:
-                                    await asyncio.sleep(leave_delay_s)
-                                except Exception:
-                                    pass
-                            print(f"[bot] engagement low, removing bot room={room_id} bot={bot.id} score={score}")
-                            # Remove from room and broadcast leave
-                            app.state.room_manager.remove_bot_from_room(room_id, bot.id)
-                            await app.state.event_bus.publish("bot:leave", {"roomId": room_id, "botId": bot.id})
-                            return
-                    except Exception as e:
-                        print(f"[bot] engagement check error room={room_id} bot={bot.id} err={e}")
-                else:
-                    print(f"[bot] reaction suppressed room={room_id} bot={bot.id}")
-            else:
-                print(f"[bot] NO REACTION room={room_id} bot={bot.id}")
-
-        # Sequentially process bots with staggered delays to avoid bursts
-        for idx, bot in enumerate(bots_in_room):
-            print(f"[bot] start reaction room={room_id} bot={bot.id}")
-            start_delay = 0.10 + 0.10 * idx + random.uniform(0.05, 0.25)
-            leave_delay = 0.05 + 0.10 * idx + random.uniform(0.05, 0.20)
-            await one_bot_react(bot, start_delay, leave_delay)
-
-        # Append transcript AFTER reactions are published to avoid duplicating
-        # the current chunk when constructing Stage-2 context (tail + chunk)
-        try:
-            app.state.room_manager.append_transcript(room_id, text_chunk)
-        except Exception:
-            pass
-
-    asyncio.create_task(generate_and_publish_reactions())
+    # The room's reaction worker picks it up (coalescing if it is busy).
+    # With several workers, only the one holding the room's bots reacts;
+    # the others just relay the transcript to their sockets.
+    if app.state.event_bus.holds_room_state(room_id):
+        app.state.reaction_workers.submit(room_id, text_chunk, flush_meta)
 
 app.state.event_bus.subscribe("transcript:chunk", _on_transcript_chunk)
 
-async def _on_bot_join(payload: dict) -> None:
+async def _on_bot_presence(payload: dict) -> None:
+    # bot:join carries the bot, bot:leave its id
     room_id = payload.get("roomId")
+    if not room_id:
+        return
     bot = payload.get("bot")
-    if not room_id or not bot:
+    if bot:
+        await app.state.ws_manager.broadcast_json(
+            room_id,
+            {"event": "join", "payload": {"bot": bot}},
+        )
         return
-    await app.state.ws_manager.broadcast_json(
-        room_id,
-        {"event": "join", "payload": {"bot": bot}},
-    )
-
-async def _on_bot_leave(payload: dict) -> None:
-    room_id = payload.get("roomId")
     bot_id = payload.get("botId")
-    if not room_id or not bot_id:
-        return
-    await app.state.ws_manager.broadcast_json(
-        room_id,
-        {"event": "leave", "payload": {"botId": bot_id}},
-    )
+    if bot_id:
+        await app.state.ws_manager.broadcast_json(
+            room_id,
+            {"event": "leave", "payload": {"botId": bot_id}},
+        )
 
-app.state.event_bus.subscribe("bot:join", _on_bot_join)
-app.state.event_bus.subscribe("bot:leave", _on_bot_leave)
+# One handler for both topics: a room's joins and leaves share one FIFO,
+# so a bot's leave can't overtake its join
+app.state.event_bus.subscribe("bot:join", _on_bot_presence)
+app.state.event_bus.subscribe("bot:leave", _on_bot_presence)
 
 async def _on_coach_feedback(payload: dict) -> None:
     room_id = payload.get("roomId")
@@ -347,4 +231,26 @@ async def _on_coach_feedback(payload: dict) -> None:
         {"event": "coach_feedback", "payload": payload},
     )
 
-app.state.event_bus.subscribe("coach:feedback", _on_coach_feedback)
\ No newline at end of file
+app.state.event_bus.subscribe("coach:feedback", _on_coach_feedback)
+
+async def _on_state_request(payload: dict) -> None:
+    # A socket on another worker reconnected: the worker holding the room's
+    # bots answers, addressed to that connection
+    room_id = payload.get("roomId")
+    if not room_id or not app.state.event_bus.holds_room_state(room_id):
+        return
+    await app.state.event_bus.publish("bot:state", {
+        "roomId": room_id,
+        "connectionId": payload.get("connectionId"),
+        "state": room_state(app.state.room_manager, room_id),
+    })
+
+async def _on_state_reply(payload: dict) -> None:
+    conn_id = payload.get("connectionId")
+    if conn_id:
+        await app.state.ws_manager.send_to_connection(
+            conn_id, {"event": "state", "payload": payload.get("state") or {"bots": []}}
+        )
+
+app.state.event_bus.subscribe("bot:state_request", _on_state_request)
+app.state.event_bus.subscribe("bot:state", _on_state_reply)
\ No newline at end of file
@@ -1,93 +1,418 @@
 import os
 import json
+import time
 import uuid
-from typing import List, Tuple, Literal
-from pydantic import BaseModel, Field
-from openai import OpenAI, APIError
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Literal
+import httpx
+from openai import AsyncOpenAI, APIError
 from openai.types.chat import ChatCompletionMessageParam
-import os
 from dotenv import load_dotenv
 
+from app.core.config import get_settings
+from app.core.metrics import quantile
+from app.schemas.room import Bot as SchemaBot, Persona as SchemaPersona
+
 # OpenRouter configuration (inline constants per user request)
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+# 'inception/mercury-coder' lowest throughoutput, # 'mistralai/ministral-8b' lowest latency, # 'x-ai/grok-code-fast-1'
+REACTION_MODEL = "mistralai/ministral-8b"
+# Default per-request timeout; reactions pass a tighter one from the caller
+REQUEST_TIMEOUT_S = 30.0
+
+Stance = Literal["supportive", "skeptical", "curious"]
+Domain = Literal["tech", "design", "finance"]
+
+
+class BotPersona:
+    """Runtime persona of a bot (plain `__slots__` object, no validation).
+
+    Validate untrusted input at the API boundary with `from_dict`, which
+    goes through the pydantic `Persona` schema.
+    """
+
+    __slots__ = ("name", "stance", "domain", "description")
+
+    def __init__(self, name: str, stance: Stance, domain: Domain, description: str) -> None:
+        self.name = name
+        self.stance = stance
+        self.domain = domain
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BotPersona":
+        """Validate a persona dict (e.g. from the persona generator); raises ValidationError."""
+        schema = SchemaPersona.model_validate(data)
+        name = data.get("name")
+        if not isinstance(name, str):
+            raise ValueError("persona name must be a string")
+        return cls.from_schema(name, schema)
+
+    @classmethod
+    def from_schema(cls, name: str, schema: SchemaPersona) -> "BotPersona":
+        return cls(name=name, stance=schema.stance, domain=schema.domain, description=schema.description)
+
+    def to_schema(self) -> SchemaPersona:
+        return SchemaPersona(stance=self.stance, domain=self.domain, description=self.description)
+
+    def __repr__(self) -> str:
+        return f"BotPersona(name={self.name!r}, stance={self.stance!r}, domain={self.domain!r})"
+
+
+def _history(values: Iterable[Any] = ()) -> Deque[Any]:
+    return deque(values, maxlen=get_settings().bot_history_size)
+
+
+class BotState:
+    """Per-bot runtime state, mutated in the reaction hot loop.
+
+    A plain `__slots__` object: attribute writes are not validated. The
+    history fields are ring buffers holding the last BOT_HISTORY_SIZE
+    entries, so a bot's memory stays constant however long a session runs.
+    """
+
+    __slots__ = (
+        "engagementScore",
+        "present",
+        "memory",
+        "engagementHistory",
+        "lastReactionTs",
+        "cooldownSeconds",
+        "reactionProbability",
+        "recentEmojis",
+        "recentPhrases",
+    )
+
+    def __init__(
+        self,
+        engagementScore: float = 10.0,
+        present: bool = True,
+        memory: Iterable[str] = (),
+        engagementHistory: Iterable[Tuple[float, float]] = (),
+        lastReactionTs: float = 0.0,
+        cooldownSeconds: float = 3.0,
+        reactionProbability: float = 1.0,  # 100% chance to react per flushed chunk
+        recentEmojis: Iterable[str] = (),
+        recentPhrases: Iterable[str] = (),
+    ) -> None:
+        self.engagementScore = float(engagementScore)
+        self.present = present
+        self.memory: Deque[str] = _history(memory)
+        self.engagementHistory: Deque[Tuple[float, float]] = _history(engagementHistory)
+        self.lastReactionTs = float(lastReactionTs)
+        self.cooldownSeconds = float(cooldownSeconds)
+        self.reactionProbability = float(reactionProbability)
+        self.recentEmojis: Deque[str] = _history(recentEmojis)
+        self.recentPhrases: Deque[str] = _history(recentPhrases)
+
+    def remember(self, text: str, emoji: Optional[str], phrase: Optional[str]) -> None:
+        """Record a published reaction and the chunk it answered."""
+        self.memory.append(text)
+        if emoji:
+            self.recentEmojis.append(emoji)
+        if phrase:
+            self.recentPhrases.append(phrase)
+
+    def __repr__(self) -> str:
+        return (
+            f"BotState(engagementScore={self.engagementScore}, present={self.present}, "
+            f"lastReactionTs={self.lastReactionTs})"
+        )
+
+# Shared reaction instructions. Kept first and byte-identical for every bot and
+# call so provider-side prompt-prefix caching can reuse it; the persona (stable
+# per bot) follows, and the volatile transcript goes in the user message.
+REACTION_INSTRUCTIONS = (
+    "You are an audience member reacting to a live talk. Respond as a tiny JSON:"
+    "\n- emoji_unicode: an emoji glyph (e.g., \"🙂\")\n"
+    "- micro_phrase: <=4 words\n"
+    "- score_delta: integer -5..5 (topic alignment drives this).\n"
+    "If the user's words clearly drift from the intended topic, lower engagement (negative score). "
+    "Do NOT penalize generic openings (e.g., introductions or greetings).\n"
+    "Example: {\"emoji_unicode\":\"🙂\",\"micro_phrase\":\"Interesting\",\"score_delta\":1}"
+)
 
-class BotPersona(BaseModel):
-    name: str
-    stance: Literal["supportive", "skeptical", "curious"]
-    domain: Literal["tech", "design", "finance"]
-    description: str
-
-class BotState(BaseModel):
-    engagementScore: float = 10.0
-    present: bool = True
-    memory: List[str] = Field(default_factory=list)
-    engagementHistory: List[Tuple[float, float]] = Field(default_factory=list)
-    lastReactionTs: float = 0.0
-    cooldownSeconds: float = 3.0
-    reactionProbability: float = 1 # 100% chance to react per flushed chunk
-    recentEmojis: List[str] = Field(default_factory=list)
-    recentPhrases: List[str] = Field(default_factory=list)
 
 def create_system_prompt(bot):
     return (
-        "You are an audience member ("
-        f"stance={bot.personality.stance}, desc={bot.personality.description}). "
-        "Respond as a tiny JSON:") + (
-        "\n- emoji_unicode: an emoji glyph (e.g., \"🙂\")\n"
-        "- micro_phrase: <=4 words\n"
-        "- score_delta: integer -5..5 (topic alignment drives this).\n"
-        "If the user's words clearly drift from the intended topic, lower engagement (negative score). "
-        "Do NOT penalize generic openings (e.g., introductions or greetings).\n"
-        "Example: {\"emoji_unicode\":\"🙂\",\"micro_phrase\":\"Interesting\",\"score_delta\":1}"
+        f"{REACTION_INSTRUCTIONS}\n"
+        f"Your persona: stance={bot.personality.stance}, desc={bot.personality.description}"
     )
 
-# Reuse one async OpenAI client per process to reduce connection/setup overhead
-_shared_client: OpenAI | None = None
+
+class LLMMetrics:
+    """Process-wide counters for reaction LLM calls.
+
+    Tracks latency and provider prompt-cache usage (cached prompt tokens
+    reported in `usage.prompt_tokens_details`).
+    """
+
+    def __init__(self, samples: int = 500) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self._latency: Deque[float] = deque(maxlen=samples)
+
+    def record(self, latency_s: float, usage) -> None:
+        self.calls += 1
+        self._latency.append(latency_s)
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        self.prompt_tokens += prompt
+        self.cached_tokens += cached
+        if cached > 0:
+            self.cache_hits += 1
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    def latency_quantile(self, q: float) -> float | None:
+        if not self._latency:
+            return None
+        ordered = sorted(self._latency)
+        return quantile(ordered, q)
+
+    def snapshot(self) -> dict:
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "cache_hit_rate": round(self.cache_hits / self.calls, 3) if self.calls else 0.0,
+            "cached_token_ratio": (
+                round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0
+            ),
+            "latency_p50_s": round(p50, 3) if p50 is not None else None,
+            "latency_p95_s": round(p95, 3) if p95 is not None else None,
+        }
 
 
-def get_client() -> OpenAI:
+llm_metrics = LLMMetrics()
+
+
+# Reuse one async OpenAI client per process: a pooled, keep-alive HTTP/2
+# connection to OpenRouter shared by every room and bot.
+_shared_client: AsyncOpenAI | None = None
+
+
+def get_client() -> AsyncOpenAI:
     global _shared_client
     if _shared_client is None:
-        _shared_client = OpenAI(
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT_S, connect=5.0),
+        )
+        _shared_client = AsyncOpenAI(
             base_url=OPENROUTER_BASE_URL,
             api_key=OPENROUTER_API_KEY,
+            http_client=http_client,
         )
     return _shared_client
 
 
-class Bot(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    avatar: str
-    personality: BotPersona
-    state: BotState
+async def close_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
+
 
-    async def generateReaction(self, transcript_chunk: str):
+class Bot:
+    """Runtime audience bot (plain `__slots__` object).
 
-        client = get_client()
-        system_prompt = create_system_prompt(self)
-        
-        messages: List[ChatCompletionMessageParam] = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": transcript_chunk}
-        ]
+    Convert to and from the API model (`app.schemas.room.Bot`) with
+    `to_schema` / `from_schema`.
+    """
 
-        try:
-            response = client.chat.completions.create(
-                model='mistralai/ministral-8b', # 'inception/mercury-coder' lowest throughoutput, # 'mistralai/ministral-8b' lowest latency, # 'x-ai/grok-code-fast-1',
-                messages=messages,
-                response_format={"type": "json_object"},
-                temperature=1,
-                max_tokens=60
-            )
-            
-            content_string = response.choices[0].message.content
-            if not content_string:
-                return None
-            
-            return json.loads(content_string)
+    __slots__ = ("id", "avatar", "personality", "state", "_system_message")
+
+    def __init__(
+        self,
+        avatar: str,
+        personality: BotPersona,
+        state: Optional[BotState] = None,
+        id: Optional[str] = None,
+    ) -> None:
+        self.id = id or str(uuid.uuid4())
+        self.avatar = avatar
+        self.personality = personality
+        self.state = state if state is not None else BotState()
+        # Built once at creation; reused verbatim so the prompt prefix is stable
+        self._system_message: Dict[str, Any] = {"role": "system", "content": create_system_prompt(self)}
+
+    @classmethod
+    def from_schema(cls, schema: SchemaBot, state: Optional[BotState] = None) -> "Bot":
+        return cls(
+            avatar=schema.avatar,
+            personality=BotPersona.from_schema(schema.name, schema.persona),
+            state=state,
+            id=schema.id,
+        )
+
+    def to_schema(self) -> SchemaBot:
+        return SchemaBot(
+            id=self.id,
+            name=self.personality.name,
+            avatar=self.avatar,
+            persona=self.personality.to_schema(),
+        )
+
+    @property
+    def system_message(self) -> Dict[str, Any]:
+        """The prebuilt system chat message; send it as is (stable prompt prefix)."""
+        return self._system_message
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system_message["content"]
+
+    def __repr__(self) -> str:
+        return f"Bot(id={self.id!r}, avatar={self.avatar!r}, personality={self.personality!r})"
 
+    async def generateReaction(
+        self,
+        transcript_chunk: str,
+        timeout_s: float | None = None,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """Ask the configured reaction backend for a tiny JSON reaction.
+
+        `timeout_s` bounds the request itself; cancelling the awaiting task
+        (e.g. via asyncio.wait_for) also aborts an in-flight HTTP request.
+        With `on_partial`, the backend reports each top-level field (e.g.
+        `emoji_unicode`) as soon as it is complete.
+        """
+        from app.services.reaction_backends import get_reaction_backend
+
+        backend = get_reaction_backend()
+        try:
+            return await backend.react(self, transcript_chunk, timeout_s=timeout_s, on_partial=on_partial)
         except (APIError, KeyError, IndexError, json.JSONDecodeError) as e:
-            print(f"[bot] Failed to get reaction for bot={self.id}: {e}")
-            return None
\ No newline at end of file
+            llm_metrics.record_failure()
+            print(f"[bot] Failed to get reaction for bot={self.id} backend={backend.name}: {e}")
+            return None
+
+
+AUDIENCE_INSTRUCTIONS = (
+    "You voice several audience members reacting to the same moment of a live talk.\n"
+    "Return a JSON object {\"reactions\": [...]} with exactly one item per member:\n"
+    "- bot_id: the member's id\n"
+    "- emoji_unicode: an emoji glyph (e.g., \"🙂\")\n"
+    "- micro_phrase: <=4 words, in that member's voice\n"
+    "- score_delta: integer -5..5 (topic alignment drives this).\n"
+    "If the user's words clearly drift from the intended topic, lower engagement (negative score). "
+    "Do NOT penalize generic openings (e.g., introductions or greetings). "
+    "Members should not all react the same way."
+)
+
+
+def create_audience_system_prompt(bots: List[Bot]) -> str:
+    # Shared instructions first (cacheable prefix), then the member list
+    members = "\n".join(
+        f"- id={b.id}: stance={b.personality.stance}, desc={b.personality.description}"
+        for b in bots
+    )
+    return f"{AUDIENCE_INSTRUCTIONS}\nMembers:\n{members}"
+
+
+def _build_audience_response_format(bot_ids: List[str]) -> dict:
+    # Strict structured outputs need an object root and reject array and
+    # number bounds (minItems/maxItems, minimum/maximum). The one-item-per-
+    # member rule is in the prompt (missing members fall back to per-bot
+    # calls) and score deltas are clamped to -5..5 by EngagementTable
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "audience_reactions",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "reactions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "bot_id": {"type": "string", "enum": bot_ids},
+                                "emoji_unicode": {"type": "string"},
+                                "micro_phrase": {"type": "string"},
+                                "score_delta": {"type": "integer"},
+                            },
+                            "required": ["bot_id", "emoji_unicode", "micro_phrase", "score_delta"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["reactions"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+async def generateAudienceReactions(
+    bots: List[Bot], transcript_chunk: str, timeout_s: float | None = None
+) -> Dict[str, dict] | None:
+    """One structured-output call for several bots ("audience batch" mode).
+
+    Returns reactions keyed by bot id (bots the model skipped are missing),
+    or None if the call or parsing failed so callers can fall back to
+    per-bot generateReaction.
+    """
+    if not bots:
+        return {}
+    client = get_client()
+    messages: List[ChatCompletionMessageParam] = [
+        {"role": "system", "content": create_audience_system_prompt(bots)},
+        {"role": "user", "content": transcript_chunk},
+    ]
+    bot_ids = [b.id for b in bots]
+    try:
+        started = time.monotonic()
+        response = await client.chat.completions.create(
+            model=REACTION_MODEL,
+            messages=messages,
+            response_format=_build_audience_response_format(bot_ids),  # type: ignore[arg-type]
+            temperature=1,
+            max_tokens=40 * len(bots),
+            timeout=timeout_s if timeout_s is not None else REQUEST_TIMEOUT_S,
+        )
+        llm_metrics.record(time.monotonic() - started, response.usage)
+        content_string = response.choices[0].message.content
+        if not content_string:
+            return None
+        data = json.loads(content_string)
+    except (APIError, KeyError, IndexError, json.JSONDecodeError) as e:
+        llm_metrics.record_failure()
+        print(f"[bot] Failed to get audience reactions bots={len(bots)}: {e}")
+        return None
+    if isinstance(data, dict):
+        # {"reactions": [...]}; other providers may pick another key
+        data = data.get("reactions", next((v for v in data.values() if isinstance(v, list)), None))
+    if not isinstance(data, list):
+        return None
+
+    wanted = set(bot_ids)
+    reactions: Dict[str, dict] = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        bot_id = item.get("bot_id")
+        if bot_id not in wanted or bot_id in reactions:
+            continue
+        reactions[bot_id] = {
+            "emoji_unicode": item.get("emoji_unicode", ""),
+            "micro_phrase": item.get("micro_phrase", ""),
+            "score_delta": item.get("score_delta", 0),
+        }
+    return reactions
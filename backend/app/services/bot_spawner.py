@@ -5,19 +5,25 @@ from typing import List, Dict, Optional
 from openai import APIError
 from openai.types.chat import ChatCompletionMessageParam
 from .bot import Bot, BotPersona, BotState, get_client
+from .llm_admission import PRIORITY_PERSONA, LLMOverloaded, estimate_tokens, get_llm_admission
 
 async def _call_openai_api(messages: List[ChatCompletionMessageParam], response_format: dict) -> Optional[str]:
     """Call OpenRouter via shared client from bot.py to generate personas with structured outputs."""
     try:
         client = get_client()
-        response = client.chat.completions.create(
-            model='x-ai/grok-code-fast-1',
-            messages=messages,
-            response_format=response_format,
-            temperature=0.9,
-            max_tokens=1200,
-        )
+        tokens = estimate_tokens(*(str(m.get("content", "")) for m in messages), completion=1200)
+        async with get_llm_admission().slot(PRIORITY_PERSONA, tokens=tokens):
+            response = await client.chat.completions.create(
+                model='x-ai/grok-code-fast-1',
+                messages=messages,
+                response_format=response_format,
+                temperature=0.9,
+                max_tokens=1200,
+            )
         return response.choices[0].message.content
+    except LLMOverloaded as e:
+        print(f"Persona generation shed by LLM admission: {e}")
+        return None
     except (APIError, KeyError, IndexError) as e:
         print(f"Failed to extract content from API response: {e}")
         return None
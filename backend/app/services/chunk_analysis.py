@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.services.chunk_scoring import ChunkScores, get_chunk_scorer
+from app.services.reaction_data import get_reaction_data
+
+
+# Reaction bucket -> EMOJI group in reaction_config
+_BUCKET_EMOJI_GROUP = {
+    "positive": "pos",
+    "negative": "neg",
+    "curious": "curious",
+    "neutral": "neutral",
+    "anticipation": "neutral",
+}
+
+
+@dataclass(frozen=True)
+class ChunkFeatures:
+    """Everything about a chunk that depends only on its text and the room category.
+
+    Computed once per `transcript:chunk` and shared by every bot in the room;
+    per-bot logic only layers the persona's stance and domain on top.
+    """
+
+    text: str
+    category: Optional[str]
+    is_question: bool
+    is_exclaim: bool
+    pos_hits: int
+    neg_hits: int
+    curiosity_triggers: Tuple[str, ...]
+    question_weight: float
+    exclaim_weight: float
+    # Applicable reaction buckets, best first; the baseline bucket (curious for
+    # questions, negative, positive, else neutral) leads, "neutral" is always
+    # present and a trigger-only "curious" comes after it
+    buckets: Tuple[str, ...]
+    emoji: str
+    # Keyword scores for every category, and domain affinity (sums to 1;
+    # the room category's domain_bias when no keyword matched)
+    scores: Optional[ChunkScores] = field(default=None, compare=False, repr=False)
+    domain_affinity: Dict[str, float] = field(default_factory=dict, compare=False)
+
+    @property
+    def bucket(self) -> str:
+        return self.buckets[0]
+
+    @property
+    def salience(self) -> float:
+        """Category-weighted punctuation signal (question/exclaim weights)."""
+        weight = 0.0
+        if self.is_question:
+            weight += self.question_weight
+        if self.is_exclaim:
+            weight += self.exclaim_weight
+        return weight
+
+    def affinity_tilt(self, domain: str) -> float:
+        """How much more the chunk is about `domain` than an even split
+        across domains would be (negative if less; 0 without affinity)."""
+        if not self.domain_affinity:
+            return 0.0
+        return self.domain_affinity.get(domain, 0.0) - 1.0 / len(self.domain_affinity)
+
+
+def _bucket_candidates(
+    is_question: bool, is_exclaim: bool, pos_hits: int, neg_hits: int, has_triggers: bool
+) -> Tuple[str, ...]:
+    # Priority: questions, then negatives, else exclaim/positive, neutral.
+    # Curiosity triggers alone only add a secondary "curious" candidate.
+    buckets = []
+    if is_question:
+        buckets.append("curious")
+    if neg_hits > pos_hits:
+        buckets.append("negative")
+    if is_exclaim or pos_hits > 0:
+        buckets.append("positive")
+    buckets.append("neutral")
+    if has_triggers and "curious" not in buckets:
+        buckets.append("curious")
+    return tuple(buckets)
+
+
+def _bucket_emoji(bucket: str) -> str:
+    group = get_reaction_data().emoji.get(_BUCKET_EMOJI_GROUP.get(bucket, "neutral"), ("😐",))
+    return group[0] if group else "😐"
+
+
+def analyze_chunk(text: str, flush_meta: dict, category: Optional[str]) -> ChunkFeatures:
+    is_question = bool(flush_meta.get("question"))
+    is_exclaim = bool(flush_meta.get("exclaim"))
+    preset = get_reaction_data().categories.get(category or "", {})
+
+    # One vectorized pass scores the chunk against every category at once
+    scores = get_chunk_scorer().score(text)
+    pos, neg, _ = scores.category(category)
+    pos_hits = int(pos)
+    neg_hits = int(neg)
+    triggers = scores.curiosity_terms.get(category or "", ())
+    if scores.domain_affinity.any():
+        domain_affinity = {d: round(float(v), 4) for d, v in zip(scores.domains, scores.domain_affinity)}
+    else:
+        domain_affinity = {d: float(v) for d, v in (preset.get("domain_bias") or {}).items()}
+
+    buckets = _bucket_candidates(is_question, is_exclaim, pos_hits, neg_hits, bool(triggers))
+    return ChunkFeatures(
+        text=text or "",
+        category=category,
+        is_question=is_question,
+        is_exclaim=is_exclaim,
+        pos_hits=pos_hits,
+        neg_hits=neg_hits,
+        curiosity_triggers=triggers,
+        question_weight=float(preset.get("question_weight", 0.0)),
+        exclaim_weight=float(preset.get("exclaim_weight", 0.0)),
+        buckets=buckets,
+        emoji=_bucket_emoji(buckets[0]),
+        scores=scores,
+        domain_affinity=domain_affinity,
+    )
@@ -0,0 +1,186 @@
+"""Vectorized keyword scoring of transcript chunks.
+
+Every keyword in reaction_config becomes one row of a term-weight matrix;
+the columns are (category, group) for group in pos/neg/curiosity, followed by
+one column per domain carrying the categories' `domain_bias`. A chunk is
+hash-vectorized into its word n-grams (rolling uint64 hashes, built with
+NumPy), the n-grams are looked up among the keyword rows with one
+`searchsorted`, and a single sparse product of the chunk's indicator vector
+with the matrix yields every category's scores plus the domain affinity.
+Only rows for known keywords are stored, so the matrix stays small and
+lookups are collision-free in practice.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.reaction_data import get_reaction_data
+
+
+GROUPS = ("keywords_pos", "keywords_neg", "curiosity_triggers")
+_TOKEN_RE = re.compile(r"\?|[^\s?\"'(),;!]+")
+_HASH_MULT = np.uint64(0x100000001B3)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; "?" is its own token, trailing . , : are dropped."""
+    tokens = []
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        tok = tok.rstrip(".,:") if tok != "?" else tok
+        if tok:
+            tokens.append(tok)
+    return tokens
+
+
+def _token_hashes(tokens: Sequence[str]) -> np.ndarray:
+    return np.fromiter((hash(t) for t in tokens), dtype=np.int64, count=len(tokens)).view(np.uint64)
+
+
+def _ngram_hashes(token_hashes: np.ndarray, max_n: int) -> np.ndarray:
+    """Rolling hashes of every 1..max_n gram, all in one uint64 array."""
+    out = [token_hashes]
+    current = token_hashes
+    for n in range(2, max_n + 1):
+        if len(token_hashes) < n:
+            break
+        current = current[:-1] * _HASH_MULT + token_hashes[n - 1:]
+        out.append(current)
+    return np.concatenate(out) if len(out) > 1 else token_hashes
+
+
+def _phrase_hash(tokens: Sequence[str]) -> int:
+    h = _ngram_hashes(_token_hashes(tokens), len(tokens))
+    return int(h[-1])
+
+
+class ChunkScores:
+    """Per-category pos/neg/curiosity scores and domain affinity for one chunk."""
+
+    __slots__ = ("categories", "domains", "matrix", "domain_affinity", "curiosity_terms")
+
+    def __init__(
+        self,
+        categories: Tuple[str, ...],
+        domains: Tuple[str, ...],
+        matrix: np.ndarray,
+        domain_affinity: np.ndarray,
+        curiosity_terms: Dict[str, Tuple[str, ...]],
+    ) -> None:
+        self.categories = categories
+        self.domains = domains
+        # (categories x 3): positive, negative, curiosity
+        self.matrix = matrix
+        # Normalized over domains; all zeros when no keyword matched
+        self.domain_affinity = domain_affinity
+        self.curiosity_terms = curiosity_terms
+
+    def category(self, name: Optional[str]) -> Tuple[float, float, float]:
+        try:
+            row = self.matrix[self.categories.index(name or "")]
+        except ValueError:
+            return 0.0, 0.0, 0.0
+        return float(row[0]), float(row[1]), float(row[2])
+
+
+class ChunkScorer:
+    """Keyword term-weight matrix for all categories in reaction_config."""
+
+    def __init__(self, categories: Dict[str, Dict[str, object]]) -> None:
+        self.categories: Tuple[str, ...] = tuple(categories)
+        domains: Dict[str, None] = {}
+        for preset in categories.values():
+            domains.update(dict.fromkeys((preset.get("domain_bias") or {})))  # type: ignore[arg-type]
+        self.domains: Tuple[str, ...] = tuple(domains)
+        n_cols = 3 * len(self.categories) + len(self.domains)
+
+        rows: Dict[int, int] = {}
+        terms: List[str] = []
+        keyword_cells: List[Tuple[int, int]] = []
+        domain_cells: Dict[Tuple[int, int], None] = {}
+        self.max_n = 1
+        for c, name in enumerate(self.categories):
+            preset = categories[name]
+            for g, group in enumerate(GROUPS):
+                for keyword in preset.get(group, ()):  # type: ignore[union-attr]
+                    tokens = tokenize(keyword)
+                    if not tokens:
+                        continue
+                    self.max_n = max(self.max_n, len(tokens))
+                    key = _phrase_hash(tokens)
+                    row = rows.get(key)
+                    if row is None:
+                        row = rows[key] = len(terms)
+                        terms.append(keyword.lower())
+                    keyword_cells.append((row, 3 * c + g))
+                    domain_cells[(row, c)] = None
+
+        weights = np.zeros((len(terms), n_cols), dtype=np.float32)
+        if keyword_cells:
+            r, col = np.asarray(keyword_cells).T
+            # A keyword counts once per (category, group), however often listed
+            weights[r, col] = 1.0
+        # Domain columns: each category a keyword belongs to adds its domain_bias once
+        bias = np.array(
+            [[float((categories[name].get("domain_bias") or {}).get(d, 0.0)) for d in self.domains]  # type: ignore[union-attr]
+             for name in self.categories],
+            dtype=np.float32,
+        ).reshape(len(self.categories), len(self.domains))
+        if domain_cells:
+            r, c = np.asarray(list(domain_cells)).T
+            np.add.at(weights[:, 3 * len(self.categories):], r, bias[c])
+
+        # Rows sorted by hash key for searchsorted lookups
+        keys = np.fromiter(rows.keys(), dtype=np.uint64, count=len(rows))
+        order = np.argsort(keys)
+        self._keys = keys[order]
+        self._weights = weights[order]
+        self._terms = np.asarray(terms, dtype=object)[order]
+
+    @property
+    def n_terms(self) -> int:
+        return len(self._keys)
+
+    def matched_rows(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        if not tokens or not len(self._keys):
+            return np.empty(0, dtype=np.int64)
+        grams = _ngram_hashes(_token_hashes(tokens), self.max_n)
+        idx = np.searchsorted(self._keys, grams)
+        idx[idx == len(self._keys)] = 0
+        return np.unique(idx[self._keys[idx] == grams])
+
+    def group_counts(self, text: str) -> Dict[str, int]:
+        """Distinct keywords from any category that hit each group."""
+        rows = self.matched_rows(text)
+        n_cat = len(self.categories)
+        hits = self._weights[rows, : 3 * n_cat].reshape(len(rows), n_cat, 3).any(axis=1).sum(axis=0)
+        return {group: int(n) for group, n in zip(GROUPS, hits)}
+
+    def score(self, text: str) -> ChunkScores:
+        rows = self.matched_rows(text)
+        n_cat = len(self.categories)
+        # Indicator vector (distinct keywords) times the term-weight matrix
+        totals = self._weights[rows].sum(axis=0) if len(rows) else np.zeros(self._weights.shape[1], np.float32)
+        matrix = totals[: 3 * n_cat].reshape(n_cat, 3)
+        affinity = totals[3 * n_cat:]
+        norm = affinity.sum()
+        if norm > 0:
+            affinity = affinity / norm
+        curiosity_terms: Dict[str, Tuple[str, ...]] = {}
+        if len(rows):
+            for c, name in enumerate(self.categories):
+                hit = self._weights[rows, 3 * c + 2] > 0
+                if hit.any():
+                    curiosity_terms[name] = tuple(self._terms[rows[hit]])
+        return ChunkScores(self.categories, self.domains, matrix, affinity, curiosity_terms)
+
+
+@lru_cache(maxsize=1)
+def get_chunk_scorer() -> ChunkScorer:
+    """Build the scorer from reaction_config once (call at startup to warm)."""
+    return ChunkScorer(get_reaction_data().categories)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict
+
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONObject:
+    """Incremental parser for one streamed JSON object.
+
+    Feed it text fragments as they arrive; `feed` returns the top-level
+    fields whose values became complete in that fragment. Strings are
+    complete at their closing quote, numbers/literals at the next delimiter,
+    nested objects/arrays at their matching bracket. Malformed input stops
+    the parser (`failed`); the caller still has the full text for json.loads.
+    """
+
+    def __init__(self) -> None:
+        self.fields: Dict[str, Any] = {}
+        self.failed = False
+        self.done = False
+        self._state = "start"
+        self._buf: list[str] = []
+        self._key = ""
+        self._escape = False
+        self._depth = 0
+        self._nested_in_string = False
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        completed: Dict[str, Any] = {}
+        if self.failed or self.done:
+            return completed
+        for ch in text:
+            if not self._step(ch, completed):
+                self.failed = True
+                break
+            if self.done:
+                break
+        return completed
+
+    def _complete(self, raw: str, completed: Dict[str, Any]) -> bool:
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return False
+        self.fields[self._key] = value
+        completed[self._key] = value
+        self._state = "after_value"
+        return True
+
+    def _step(self, ch: str, completed: Dict[str, Any]) -> bool:
+        state = self._state
+        if state == "start":
+            if ch in _WHITESPACE:
+                return True
+            if ch == "{":
+                self._state = "key_or_end"
+                return True
+            return False
+
+        if state in ("key_or_end", "key"):
+            if ch in _WHITESPACE:
+                return True
+            if ch == '"':
+                self._state = "in_key"
+                self._buf = []
+                return True
+            if ch == "}" and state == "key_or_end":
+                self.done = True
+                return True
+            return False
+
+        if state in ("in_key", "in_string"):
+            if self._escape:
+                self._escape = False
+                self._buf.append(ch)
+                return True
+            if ch == "\\":
+                self._escape = True
+                self._buf.append(ch)
+                return True
+            if ch != '"':
+                self._buf.append(ch)
+                return True
+            raw = '"' + "".join(self._buf) + '"'
+            if state == "in_key":
+                try:
+                    self._key = json.loads(raw)
+                except ValueError:
+                    return False
+                self._state = "colon"
+                return True
+            return self._complete(raw, completed)
+
+        if state == "colon":
+            if ch in _WHITESPACE:
+                return True
+            if ch == ":":
+                self._state = "value"
+                return True
+            return False
+
+        if state == "value":
+            if ch in _WHITESPACE:
+                return True
+            self._buf = [ch]
+            if ch == '"':
+                self._buf = []
+                self._state = "in_string"
+            elif ch in "{[":
+                self._depth = 1
+                self._nested_in_string = False
+                self._state = "in_nested"
+            else:
+                self._state = "in_scalar"
+            return True
+
+        if state == "in_scalar":
+            if ch in _WHITESPACE or ch in ",}":
+                if not self._complete("".join(self._buf), completed):
+                    return False
+                return self._step(ch, completed) if ch in ",}" else True
+            self._buf.append(ch)
+            return True
+
+        if state == "in_nested":
+            self._buf.append(ch)
+            if self._nested_in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._nested_in_string = False
+                return True
+            if ch == '"':
+                self._nested_in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._complete("".join(self._buf), completed)
+            return True
+
+        if state == "after_value":
+            if ch in _WHITESPACE:
+                return True
+            if ch == ",":
+                self._state = "key"
+                return True
+            if ch == "}":
+                self.done = True
+                return True
+            return False
+
+        return False
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+
+# Priority classes, lower value is admitted first. Persona generation is a
+# user-facing request (room setup), reactions are best-effort.
+PRIORITY_PERSONA = "persona"
+PRIORITY_REACTION = "reaction"
+_PRIORITY_ORDER = {PRIORITY_PERSONA: 0, PRIORITY_REACTION: 1}
+
+
+class LLMOverloaded(Exception):
+    """Raised instead of queueing when a priority class's queue is full."""
+
+
+class TokenBucket:
+    """Classic token bucket; `rate` tokens per second up to `capacity`. rate <= 0 disables it."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.enabled:
+            self._tokens -= min(amount, self.capacity)
+
+
+class LLMAdmissionController:
+    """Process-wide admission control for LLM calls.
+
+    - at most `max_concurrency` calls in flight across all rooms
+    - requests-per-second and tokens-per-minute budgets (token buckets)
+    - strict priority between classes (persona before reaction), FIFO within
+    - per-class queue limits: a full queue sheds the request (LLMOverloaded)
+      so callers can fall back (stage-1 for reactions) instead of piling up
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        rps: float = 0.0,
+        tpm: float = 0.0,
+        max_queue: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._rps = TokenBucket(rps, capacity=max(1.0, rps))
+        self._tpm = TokenBucket(tpm / 60.0, capacity=tpm)
+        self.max_queue = {PRIORITY_PERSONA: 16, PRIORITY_REACTION: 64, **(max_queue or {})}
+        self._active = 0
+        # (priority, seq, future, tokens)
+        self._queue: List[Tuple[int, int, "asyncio.Future[None]", int]] = []
+        self._seq = itertools.count()
+        self._retry: Optional[asyncio.TimerHandle] = None
+        self._waiting: Dict[str, int] = {kind: 0 for kind in _PRIORITY_ORDER}
+        self._admitted: Dict[str, int] = {kind: 0 for kind in _PRIORITY_ORDER}
+        self._shed: Dict[str, int] = {kind: 0 for kind in _PRIORITY_ORDER}
+        self._wait_total_s: Dict[str, float] = {kind: 0.0 for kind in _PRIORITY_ORDER}
+
+    @asynccontextmanager
+    async def slot(self, kind: str = PRIORITY_REACTION, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one admission slot for the duration of an LLM call.
+
+        `tokens` is the caller's estimate (prompt + max completion) charged to
+        the tokens-per-minute budget on admission.
+        """
+        await self._acquire(kind, tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, kind: str, tokens: int) -> None:
+        if kind not in _PRIORITY_ORDER:
+            raise ValueError(f"unknown LLM priority class: {kind}")
+        if self._waiting[kind] >= self.max_queue.get(kind, 0) and not self._can_admit_now():
+            self._shed[kind] += 1
+            raise LLMOverloaded(f"{kind} queue full ({self._waiting[kind]} waiting)")
+
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[None]" = loop.create_future()
+        heapq.heappush(self._queue, (_PRIORITY_ORDER[kind], next(self._seq), fut, max(0, int(tokens))))
+        self._waiting[kind] += 1
+        started = loop.time()
+        self._pump()
+        try:
+            await fut
+        except BaseException:
+            # Cancelled (caller timeout) while queued, or right after being granted
+            if fut.done() and not fut.cancelled():
+                self._release()
+            else:
+                fut.cancel()
+            raise
+        finally:
+            self._waiting[kind] -= 1
+        self._admitted[kind] += 1
+        self._wait_total_s[kind] += loop.time() - started
+
+    def _can_admit_now(self) -> bool:
+        return not self._queue and self._active < self.max_concurrency and self._rps.wait_time(1) == 0
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        """Admit queued requests in priority order while capacity and budgets allow."""
+        while self._queue and self._active < self.max_concurrency:
+            _, _, fut, tokens = self._queue[0]
+            if fut.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = max(self._rps.wait_time(1), self._tpm.wait_time(tokens))
+            if wait > 0:
+                self._schedule_retry(wait)
+                return
+            heapq.heappop(self._queue)
+            self._rps.take(1)
+            self._tpm.take(tokens)
+            self._active += 1
+            fut.set_result(None)
+
+    def _schedule_retry(self, delay: float) -> None:
+        if self._retry is not None and not self._retry.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def _fire() -> None:
+            self._retry = None
+            self._pump()
+
+        self._retry = loop.call_later(delay, _fire)
+
+    def queue_depth(self, kind: Optional[str] = None) -> int:
+        if kind is None:
+            return sum(self._waiting.values())
+        return self._waiting.get(kind, 0)
+
+    def stats(self) -> dict:
+        classes = {}
+        for kind in _PRIORITY_ORDER:
+            admitted = self._admitted[kind]
+            classes[kind] = {
+                "queued": self._waiting[kind],
+                "max_queue": self.max_queue.get(kind, 0),
+                "admitted": admitted,
+                "shed": self._shed[kind],
+                "avg_wait_ms": round(1000 * self._wait_total_s[kind] / admitted, 1) if admitted else 0.0,
+            }
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "rps": self._rps.rate,
+            "tpm": round(self._tpm.rate * 60.0),
+            "classes": classes,
+        }
+
+
+def estimate_tokens(*texts: str, completion: int = 0) -> int:
+    """Rough token estimate (~4 chars per token) for the TPM budget."""
+    return sum(len(t or "") for t in texts) // 4 + completion
+
+
+@lru_cache
+def get_llm_admission() -> LLMAdmissionController:
+    settings = get_settings()
+    return LLMAdmissionController(
+        max_concurrency=settings.llm_max_concurrency,
+        rps=settings.llm_rps,
+        tpm=settings.llm_tpm,
+        max_queue={
+            PRIORITY_PERSONA: settings.llm_persona_max_queue,
+            PRIORITY_REACTION: settings.llm_reaction_max_queue,
+        },
+    )
@@ -0,0 +1,342 @@
+"""Pluggable stage-2 reaction backends behind `Bot.generateReaction`.
+
+- remote: OpenAI-compatible chat completions (OpenRouter by default)
+- local:  CPU-only softmax classifier over lexical chunk features; no network
+- mock:   the remote code path against an in-process, deterministic
+          OpenAI-compatible mock server (for tests and load runs)
+
+Select with REACTION_BACKEND=remote|local|mock.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
+
+from app.services.bot import REACTION_MODEL, REQUEST_TIMEOUT_S, get_client, llm_metrics
+from app.services.json_stream import IncrementalJSONObject
+from app.services.chunk_scoring import get_chunk_scorer
+from app.services.reaction_data import get_reaction_data, pick_phrase
+
+if TYPE_CHECKING:
+    from app.services.bot import Bot
+
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+class ReactionBackend(abc.ABC):
+    """Base class: turn (bot, transcript text) into a reaction dict or None."""
+
+    name = "base"
+    # Calls cost provider quota and go through LLM admission control
+    uses_llm = True
+
+    @abc.abstractmethod
+    async def react(
+        self,
+        bot: "Bot",
+        transcript_chunk: str,
+        timeout_s: float | None = None,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Optional[dict]:
+        """Return the bot's reaction to `transcript_chunk`, or None."""
+
+    def warm(self) -> None:
+        """Build anything expensive up front (called at startup)."""
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class RemoteReactionBackend(ReactionBackend):
+    """OpenAI-compatible chat completions; streams when `on_partial` is given."""
+
+    name = "remote"
+
+    def __init__(
+        self,
+        client_factory: Callable[[], AsyncOpenAI] = get_client,
+        model: str = REACTION_MODEL,
+    ) -> None:
+        self._client_factory = client_factory
+        self.model = model
+
+    async def react(
+        self,
+        bot: "Bot",
+        transcript_chunk: str,
+        timeout_s: float | None = None,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Optional[dict]:
+        client = self._client_factory()
+        messages: List[ChatCompletionMessageParam] = [
+            bot.system_message,  # type: ignore[list-item]
+            {"role": "user", "content": transcript_chunk},
+        ]
+        timeout = timeout_s if timeout_s is not None else REQUEST_TIMEOUT_S
+        started = time.monotonic()
+        if on_partial is not None:
+            content_string = await self._stream(client, bot, messages, timeout, on_partial)
+        else:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=1,
+                max_tokens=60,
+                timeout=timeout,
+            )
+            llm_metrics.record(time.monotonic() - started, response.usage)
+            content_string = response.choices[0].message.content
+        if not content_string:
+            return None
+        return json.loads(content_string)
+
+    async def _stream(
+        self,
+        client: AsyncOpenAI,
+        bot: "Bot",
+        messages: List[ChatCompletionMessageParam],
+        timeout: float,
+        on_partial: PartialCallback,
+    ) -> str:
+        started = time.monotonic()
+        stream = await client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=1,
+            max_tokens=60,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parser = IncrementalJSONObject()
+        parts: List[str] = []
+        usage = None
+        # Closing the stream releases the HTTP connection even when a hedge,
+        # timeout or shutdown cancels us mid-stream
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                completed = parser.feed(delta)
+                if completed:
+                    try:
+                        on_partial(completed)
+                    except Exception as e:
+                        print(f"[bot] partial reaction callback failed bot={bot.id}: {e}")
+        llm_metrics.record(time.monotonic() - started, usage)
+        return "".join(parts)
+
+
+# === Local CPU classifier ===
+_BUCKETS = ("positive", "negative", "curious", "neutral")
+# Features: bias, positive hits, negative hits, curiosity hits, "?", "!", log(words)
+_WEIGHTS: Tuple[Tuple[float, ...], ...] = (
+    (0.2, 1.1, -0.9, 0.1, -0.4, 0.8, 0.0),   # positive
+    (-0.6, -0.7, 1.4, 0.0, -0.2, 0.1, 0.0),  # negative
+    (-0.2, 0.0, 0.2, 1.0, 1.5, -0.3, 0.1),   # curious
+    (0.6, -0.3, -0.3, -0.3, -0.5, -0.4, 0.0),  # neutral
+)
+# Stance priors added to the logits, in _BUCKETS order
+_STANCE_BIAS: Dict[str, Tuple[float, ...]] = {
+    "supportive": (0.6, -0.4, 0.0, 0.0),
+    "skeptical": (-0.4, 0.5, 0.3, 0.0),
+    "curious": (0.0, -0.2, 0.7, 0.0),
+}
+_BUCKET_EMOJI_GROUP = {"positive": "pos", "negative": "neg", "curious": "curious", "neutral": "neutral"}
+
+
+def _input_rng(bot: "Bot", text: str) -> random.Random:
+    # Same bot + same text -> same reaction; different bots diverge
+    digest = hashlib.blake2b(f"{bot.id}\n{text}".encode("utf-8"), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+class LocalReactionBackend(ReactionBackend):
+    """Softmax classifier over lexical features, run in-process on the CPU.
+
+    The lexicon is the union of every category's keyword lists, matched on
+    whole words like stage 1 (the shared chunk scorer). Logits are a
+    fixed linear model plus a stance prior; the bucket is sampled from the
+    softmax with a per-(bot, text) seeded RNG, then the emoji and phrase come
+    from reaction_config like stage 1 does.
+    """
+
+    name = "local"
+    uses_llm = False
+
+    def warm(self) -> None:
+        get_chunk_scorer()
+
+    def features(self, text: str) -> Tuple[float, ...]:
+        counts = get_chunk_scorer().group_counts(text)
+        stripped = text.rstrip()
+        return (
+            1.0,
+            float(counts["keywords_pos"]),
+            float(counts["keywords_neg"]),
+            float(counts["curiosity_triggers"]),
+            1.0 if stripped.endswith("?") else 0.0,
+            1.0 if stripped.endswith("!") else 0.0,
+            math.log1p(len(text.split())),
+        )
+
+    def probabilities(self, text: str, stance: str) -> Dict[str, float]:
+        x = self.features(text)
+        prior = _STANCE_BIAS.get(stance, (0.0,) * len(_BUCKETS))
+        logits = [sum(w * f for w, f in zip(row, x)) + b for row, b in zip(_WEIGHTS, prior)]
+        top = max(logits)
+        exps = [math.exp(v - top) for v in logits]
+        total = sum(exps)
+        return {bucket: e / total for bucket, e in zip(_BUCKETS, exps)}
+
+    async def react(
+        self,
+        bot: "Bot",
+        transcript_chunk: str,
+        timeout_s: float | None = None,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Optional[dict]:
+        stance = bot.personality.stance
+        probs = self.probabilities(transcript_chunk, stance)
+        rng = _input_rng(bot, transcript_chunk)
+        bucket = rng.choices(_BUCKETS, weights=[probs[b] for b in _BUCKETS])[0]
+        emojis = get_reaction_data().emoji.get(_BUCKET_EMOJI_GROUP[bucket]) or ("😐",)
+        emoji = emojis[rng.randrange(len(emojis))]
+        if on_partial is not None:
+            on_partial({"emoji_unicode": emoji})
+        confident = probs[bucket] >= 0.6
+        if bucket == "positive":
+            delta = 2 if confident else 1
+        elif bucket == "negative":
+            delta = -2 if confident else -1
+        elif bucket == "curious" and stance == "curious":
+            delta = 1
+        else:
+            delta = 0
+        return {
+            "emoji_unicode": emoji,
+            "micro_phrase": pick_phrase(stance, bucket, bot.personality.domain, rng),
+            "score_delta": delta,
+        }
+
+
+# === Deterministic mock server ===
+_MOCK_EMOJIS = ("🙂", "🤔", "🔥", "👏", "😐", "🧐")
+_MOCK_PHRASES = ("makes sense", "tell me more", "nice point", "hmm, really?", "go on", "not sure")
+
+
+def _mock_reaction(seed_text: str) -> dict:
+    digest = hashlib.blake2b(seed_text.encode("utf-8"), digest_size=8).digest()
+    return {
+        "emoji_unicode": _MOCK_EMOJIS[digest[0] % len(_MOCK_EMOJIS)],
+        "micro_phrase": _MOCK_PHRASES[digest[1] % len(_MOCK_PHRASES)],
+        "score_delta": digest[2] % 5 - 2,
+    }
+
+
+def _mock_completion(content: str, stream: bool) -> httpx.Response:
+    usage = {"prompt_tokens": len(content) // 4, "completion_tokens": 16, "total_tokens": len(content) // 4 + 16}
+    if not stream:
+        return httpx.Response(200, json={
+            "id": "mock", "object": "chat.completion", "created": 0, "model": "mock",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+    # Field by field, so incremental parsing is exercised
+    pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+    events = [
+        {"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": "mock",
+         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        for piece in pieces
+    ]
+    events.append({"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": "mock",
+                   "choices": [], "usage": usage})
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+    return httpx.Response(200, content=body.encode("utf-8"), headers={"content-type": "text/event-stream"})
+
+
+class MockReactionServer:
+    """In-process OpenAI-compatible chat completions endpoint (httpx transport).
+
+    The answer is a pure function of the request messages; `latency_s` adds a
+    fixed delay per request to simulate a slow provider.
+    """
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+        self.requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency_s > 0:
+            await asyncio.sleep(self.latency_s)
+        body = json.loads(request.content)
+        seed = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = json.dumps(_mock_reaction(seed), ensure_ascii=False)
+        return _mock_completion(content, bool(body.get("stream")))
+
+    def client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            base_url="http://mock.invalid/v1",
+            api_key="mock",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+        )
+
+
+class MockReactionBackend(RemoteReactionBackend):
+    """The remote backend talking to a MockReactionServer."""
+
+    name = "mock"
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.server = MockReactionServer(latency_s)
+        self._client = self.server.client()
+        super().__init__(client_factory=lambda: self._client, model="mock/reaction")
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def create_reaction_backend(name: str, mock_latency_s: float = 0.0) -> ReactionBackend:
+    if name == "local":
+        return LocalReactionBackend()
+    if name == "mock":
+        return MockReactionBackend(latency_s=mock_latency_s)
+    if name != "remote":
+        print(f"[bot] unknown reaction backend {name!r}; using remote")
+    return RemoteReactionBackend()
+
+
+_backend: Optional[ReactionBackend] = None
+
+
+def get_reaction_backend() -> ReactionBackend:
+    global _backend
+    if _backend is None:
+        _backend = RemoteReactionBackend()
+    return _backend
+
+
+def set_reaction_backend(backend: ReactionBackend) -> None:
+    global _backend
+    _backend = backend
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.services.reaction_data import get_reaction_data
+
+
+_PUNCT_RE = re.compile(r"[^\w\s']+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_chunk(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("Thank you!" == "thank you")."""
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "").lower())).strip()
+
+
+class ReactionCache:
+    """Bounded LRU/TTL cache for stage-2 reactions.
+
+    Keyed on the normalized chunk text plus the persona class (stance,
+    domain) and, optionally, a hash of the persona description. Hits are
+    returned with a little jitter so bots sharing an answer don't look cloned.
+    Memory is capped both by entry count and by an approximate byte budget.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: float = 900.0,
+        max_bytes: int = 1_000_000,
+        max_text_chars: int = 160,
+        key_on_persona: bool = False,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_text_chars = max_text_chars
+        self.key_on_persona = key_on_persona
+        # key -> (expires_at, size, reaction)
+        self._entries: "OrderedDict[str, Tuple[float, int, dict]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, text: str, stance: str, domain: str, description: str = "") -> Optional[str]:
+        """Return the cache key, or None if this chunk should not be cached."""
+        if self.max_entries <= 0:
+            return None
+        norm = normalize_chunk(text)
+        if not norm or len(norm) > self.max_text_chars:
+            return None
+        key = f"{stance}|{domain}|{norm}"
+        if self.key_on_persona and description:
+            key += "|" + hashlib.sha1(description.encode("utf-8")).hexdigest()[:12]
+        return key
+
+    def contains(self, key: Optional[str]) -> bool:
+        """Peek without touching LRU order or hit counters."""
+        if key is None:
+            return False
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def get(self, key: Optional[str], rng: Optional[random.Random] = None) -> Optional[dict]:
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, reaction = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _jitter(reaction, rng)
+
+    def put(self, key: Optional[str], reaction: dict) -> None:
+        if key is None or not isinstance(reaction, dict):
+            return
+        if key in self._entries:
+            self._drop(key)
+        size = len(key) + sum(len(str(k)) + len(str(v)) for k, v in reaction.items())
+        self._entries[key] = (time.monotonic() + self.ttl_s, size, dict(reaction))
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def _jitter(reaction: dict, rng: Optional[random.Random] = None) -> dict:
+    """Return a lightly varied copy: sibling emoji from the same group and
+    small surface changes to the phrase. score_delta is left untouched."""
+    rng = rng or random  # type: ignore[assignment]
+    out = dict(reaction)
+    emoji = out.get("emoji_unicode")
+    if isinstance(emoji, str) and rng.random() < 0.5:
+        for group in get_reaction_data().emoji.values():
+            if emoji in group and len(group) > 1:
+                out["emoji_unicode"] = rng.choice(group)
+                break
+    phrase = out.get("micro_phrase")
+    if isinstance(phrase, str) and phrase:
+        roll = rng.random()
+        if roll < 0.25:
+            out["micro_phrase"] = phrase.lower()
+        elif roll < 0.4 and phrase[-1] not in "!?.":
+            out["micro_phrase"] = phrase + "!"
+        elif roll < 0.5 and phrase[-1] in "!.":
+            out["micro_phrase"] = phrase[:-1]
+    return out
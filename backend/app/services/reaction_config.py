@@ -11366,57 +11366,5 @@ ENCOURAGE = [
 
 STAGE2_BIAS_PROB = 0.75        # 35% escalate on questions for allowed stances (balance latency vs depth)
 
-# === Helper functions required by main.py ===
-def get_phrases(stance: str, bucket: str, domain: str) -> list[str]:
-    try:
-        key = (stance, "pos" if bucket == "positive" else bucket, domain)
-        tpl = globals().get("TEMPLATES", {})
-        phrases = tpl.get(key, [])  # type: ignore[arg-type]
-        if phrases:
-            return phrases
-        defaults = globals().get("DEFAULT_PHRASES", {})
-        return list(defaults.get(bucket, []))  # type: ignore[index]
-    except Exception:
-        return []
-
-# === Additional helpers to simplify main.py ===
-    """Select a phrase at random from the bucket; no LRU tracking to simplify behavior."""
-    phrases = get_phrases(stance, bucket, domain)
-    default_phrase = globals().get("DEFAULT_PHRASE", {}).get(bucket, "")  # type: ignore[index]
-    if not phrases:
-        return default_phrase
-    try:
-        import random as _random
-        return _random.choice(phrases)
-    except Exception:
-        return phrases[0]
-
-def should_escalate(is_question: bool, stance: str) -> tuple[bool, bool]:
-    """Return (escalate, escalate_allowed) based on stance and configured bias when a question is detected."""
-    try:
-        escalate_allowed = bool(is_question) and (stance in globals().get("ESCALATE_ON_QUESTION_STANCES", set()))
-    except Exception:
-        escalate_allowed = bool(is_question)
-    if not escalate_allowed:
-        return False, escalate_allowed
-    try:
-        import random as _random
-        escalate_bias = float(globals().get("STAGE2_BIAS_PROB"))
-        return (_random.random() < escalate_bias), escalate_allowed
-    except Exception:
-        return False, escalate_allowed
-
-def compute_reaction_probability(
-    base_probability: float,
-    stance: str,
-) -> float:
-    """Return base probability; simplified (no stutter effect)."""
-    try:
-        prob = float(base_probability)
-        if prob < 0.0:
-            return 0.0
-        if prob > 1.0:
-            return 1.0
-        return prob
-    except Exception:
-        return base_probability
\ No newline at end of file
+# Helpers (get_phrases, compute_reaction_probability) live in reaction_data.py,
+# which loads this module through a precompiled artifact.
@@ -0,0 +1,248 @@
+"""Fast-loading runtime view of reaction_config.
+
+reaction_config.py is a large generated Python literal; importing it means
+parsing/compiling ~11k lines on every cold start. This module compiles it
+once into a pickled artifact (keyword tables as newline-joined blobs,
+template index, emoji groups, scalar knobs) and loads that lazily on first
+use. `import app.main` never imports reaction_config itself.
+
+Build step (also done automatically when the artifact is missing or stale):
+
+    python -m app.services.reaction_data
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import pickle
+import random
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+SOURCE_PATH = Path(__file__).with_name("reaction_config.py")
+ARTIFACT_PATH = Path(__file__).with_name("reaction_config.bin")
+_FORMAT_VERSION = 2
+
+# (stance, template bucket, domain)
+TemplateKey = Tuple[str, str, str]
+
+
+class ReactionData:
+    """Read-only reaction tables; list values from reaction_config become tuples.
+
+    `templates` is indexed by (stance, template bucket, domain) tuples, where
+    the template bucket uses the TEMPLATES spelling ("pos", "neg", ...).
+    """
+
+    __slots__ = (
+        "categories",
+        "templates",
+        "emoji",
+        "default_phrase",
+        "default_phrases",
+        "escalate_on_question_stances",
+        "stage2_timeout_s",
+        "stage2_bias_prob",
+    )
+
+    def __init__(
+        self,
+        categories: Dict[str, Dict[str, Any]],
+        templates: Dict[TemplateKey, Tuple[str, ...]],
+        emoji: Dict[str, Tuple[str, ...]],
+        default_phrase: Dict[str, str],
+        default_phrases: Dict[str, Tuple[str, ...]],
+        escalate_on_question_stances: Tuple[str, ...],
+        stage2_timeout_s: float,
+        stage2_bias_prob: float,
+    ) -> None:
+        self.categories = categories
+        self.templates = templates
+        self.emoji = emoji
+        self.default_phrase = default_phrase
+        self.default_phrases = default_phrases
+        self.escalate_on_question_stances = escalate_on_question_stances
+        self.stage2_timeout_s = stage2_timeout_s
+        self.stage2_bias_prob = stage2_bias_prob
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _source_signature() -> Tuple[int, int]:
+    # Size + mtime is enough to notice an edited/regenerated reaction_config.py
+    # without reading the whole source on every start.
+    st = SOURCE_PATH.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _index_templates(templates: Dict[str, Any]) -> Dict[TemplateKey, Tuple[str, ...]]:
+    """Parse TEMPLATES' string keys ("('supportive', 'pos', 'tech')") into tuples."""
+    index: Dict[TemplateKey, Tuple[str, ...]] = {}
+    for raw_key, phrases in templates.items():
+        key = ast.literal_eval(raw_key) if isinstance(raw_key, str) else raw_key
+        if isinstance(key, tuple) and len(key) == 3 and phrases:
+            index[(str(key[0]), str(key[1]), str(key[2]))] = tuple(phrases)
+    return index
+
+
+def _from_source() -> ReactionData:
+    from app.services import reaction_config as rc
+
+    categories: Dict[str, Dict[str, Any]] = {}
+    for name, preset in rc.CATEGORIES.items():
+        categories[name] = {
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in preset.items()
+        }
+    return ReactionData(
+        categories=categories,
+        templates=_index_templates(rc.TEMPLATES),
+        emoji={key: tuple(value) for key, value in rc.EMOJI.items()},
+        default_phrase=dict(rc.DEFAULT_PHRASE),
+        default_phrases={key: tuple(value) for key, value in rc.DEFAULT_PHRASES.items()},
+        escalate_on_question_stances=tuple(rc.ESCALATE_ON_QUESTION_STANCES),
+        stage2_timeout_s=float(rc.STAGE2_TIMEOUT_S),
+        stage2_bias_prob=float(rc.STAGE2_BIAS_PROB),
+    )
+
+
+# Keyword lists are stored as one newline-joined string per group: a single
+# compact blob unpickles far faster than thousands of small str objects.
+_KEYWORD_SEP = "\n"
+
+
+def _pack(data: ReactionData) -> Dict[str, Any]:
+    packed = data.to_dict()
+    categories: Dict[str, Dict[str, Any]] = {}
+    keywords: Dict[str, Dict[str, str]] = {}
+    for name, preset in data.categories.items():
+        categories[name] = {k: v for k, v in preset.items() if not isinstance(v, tuple)}
+        keywords[name] = {k: _KEYWORD_SEP.join(v) for k, v in preset.items() if isinstance(v, tuple)}
+    packed["categories"] = categories
+    packed["keywords"] = keywords
+    return packed
+
+
+def _unpack(packed: Dict[str, Any]) -> ReactionData:
+    packed = dict(packed)
+    keywords = packed.pop("keywords")
+    categories = {}
+    for name, preset in packed["categories"].items():
+        groups = {k: tuple(blob.split(_KEYWORD_SEP)) if blob else () for k, blob in keywords[name].items()}
+        categories[name] = {**preset, **groups}
+    packed["categories"] = categories
+    return ReactionData(**packed)
+
+
+def build_artifact(path: Path = ARTIFACT_PATH) -> ReactionData:
+    """Compile reaction_config.py into the binary artifact at `path`."""
+    data = _from_source()
+    blob = pickle.dumps(
+        {"version": _FORMAT_VERSION, "source": _source_signature(), "data": _pack(data)},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    # Unique temp file per build: several workers may build at startup
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        # mkstemp files are 0600; keep the artifact readable like before
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return data
+
+
+def _load_artifact(path: Path) -> Optional[ReactionData]:
+    try:
+        with path.open("rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        # Missing, truncated or stale (ValueError, ImportError, IndexError,
+        # ...): any failure means rebuild
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != _FORMAT_VERSION:
+        return None
+    if tuple(payload.get("source") or ()) != _source_signature():
+        return None
+    try:
+        return _unpack(payload["data"])
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+_data: Optional[ReactionData] = None
+
+
+def get_reaction_data() -> ReactionData:
+    """Return reaction data, loading the artifact (or rebuilding it) on first use."""
+    global _data
+    if _data is None:
+        data = _load_artifact(ARTIFACT_PATH)
+        if data is None:
+            try:
+                data = build_artifact()
+                print(f"[reaction_data] built artifact {ARTIFACT_PATH.name}")
+            except OSError:
+                # Read-only deploys: fall back to the source module
+                data = _from_source()
+        _data = data
+    return _data
+
+
+# === Helpers used by the reaction pipeline ===
+# Reaction bucket -> bucket spelling used in TEMPLATES keys
+_TEMPLATE_BUCKET = {
+    "positive": "pos",
+    "negative": "neg",
+    "curious": "curious",
+    "neutral": "neutral",
+    "anticipation": "anticipation",
+}
+
+
+def get_phrases(stance: str, bucket: str, domain: str) -> Tuple[str, ...]:
+    """Return the phrase tuple for (stance, bucket, domain), falling back to
+    the bucket's DEFAULT_PHRASES. The tuple is shared; never copied."""
+    data = get_reaction_data()
+    phrases = data.templates.get((stance, _TEMPLATE_BUCKET.get(bucket, bucket), domain))
+    if phrases:
+        return phrases
+    return data.default_phrases.get(bucket, ())
+
+
+def pick_phrase(stance: str, bucket: str, domain: str, rng: Optional[random.Random] = None) -> str:
+    """Pick one phrase in O(1) without building or copying lists."""
+    phrases = get_phrases(stance, bucket, domain)
+    if not phrases:
+        return get_reaction_data().default_phrase.get(bucket, "")
+    return phrases[(rng or random).randrange(len(phrases))]
+
+
+def compute_reaction_probability(
+    base_probability: float,
+    stance: str,
+) -> float:
+    """Return base probability; simplified (no stutter effect)."""
+    try:
+        prob = float(base_probability)
+        if prob < 0.0:
+            return 0.0
+        if prob > 1.0:
+            return 1.0
+        return prob
+    except Exception:
+        return base_probability
+
+
+if __name__ == "__main__":
+    build_artifact()
+    print(f"wrote {ARTIFACT_PATH}")
@@ -0,0 +1,615 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from app.services.bot import Bot, generateAudienceReactions, llm_metrics
+from app.services.chunk_analysis import ChunkFeatures
+from app.services.llm_admission import LLMOverloaded, estimate_tokens
+from app.services.reaction_data import get_reaction_data, pick_phrase
+from app.services.reaction_backends import get_reaction_backend
+from app.services.reaction_cache import ReactionCache
+from app.services.reaction_scheduler import ReactionScheduler
+
+if TYPE_CHECKING:
+    from app.events.bus import EventBus
+    from app.state.room_manager import RoomManager
+    from app.ws.manager import ConnectionManager
+
+
+def _parse_delta(val: Any) -> float:
+    try:
+        if isinstance(val, (int, float)):
+            value = float(val)
+        elif isinstance(val, str):
+            value = float(val.strip())
+        else:
+            return 0.0
+    except ValueError:
+        return 0.0
+    # NaN would poison the bot's score for good; treat +-inf as bogus too
+    return value if math.isfinite(value) else 0.0
+
+
+def _consume_task_result(task: "asyncio.Task") -> None:
+    # Hedged-away stage-2 tasks may finish with nobody awaiting them
+    if not task.cancelled():
+        task.exception()
+
+
+PARTIAL_EVENT = "reaction_partial"
+# Decision-path diagnostics; opt-in per connection
+DEBUG_EVENT = "reaction_debug"
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+class _Delivery:
+    """Per-bot delivery state for one chunk.
+
+    The publish gate (cooldown and reaction probability) is decided up front
+    for the whole room, so an early partial (streamed emoji) and the final
+    reaction share one gating decision.
+    """
+
+    __slots__ = (
+        "allowed", "release_ts", "rng", "emoji", "partial_task", "committed", "final", "published_at",
+        "hedge_after_s",
+    )
+
+    def __init__(self, allowed: bool, release_ts: float, rng: random.Random) -> None:
+        self.allowed = allowed
+        # Scheduled release on the pipeline clock; recorded as the reaction time
+        self.release_ts = release_ts
+        # The bot's own RNG for this chunk (phrase picks, cache jitter)
+        self.rng = rng
+        self.emoji: Optional[str] = None
+        self.partial_task: Optional["asyncio.Task[None]"] = None
+        # A partial went out: the final reaction skips gating and keeps its emoji
+        self.committed = False
+        # The final reaction is known; late partials are pointless
+        self.final = False
+        self.published_at: Optional[float] = None
+        # Hedge wait actually used for this bot's stage-2 call (for diagnostics)
+        self.hedge_after_s: Optional[float] = None
+
+
+class ReactionPipeline:
+    """Turns a transcript chunk into bot reactions for one room.
+
+    All bots in the room react concurrently; delivery is spread over the
+    scheduler's release window instead of serialized sleeps. `run` returns
+    once the fast path is published: late stage-2 answers (after a hedge)
+    and staggered leave events go out from tracked background tasks, so
+    they never hold up the room's next chunk.
+    """
+
+    def __init__(
+        self,
+        room_manager: "RoomManager",
+        ws_manager: "ConnectionManager",
+        event_bus: "EventBus",
+        scheduler: ReactionScheduler,
+        cache: Optional[ReactionCache] = None,
+        batch_mode: bool = False,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_s: float = 1.0,
+        hedge_late: str = "replace",
+        partial_events: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.room_manager = room_manager
+        self.ws_manager = ws_manager
+        self.event_bus = event_bus
+        self.scheduler = scheduler
+        self.cache = cache
+        # Audience batch: one structured LLM call per chunk for all escalating bots
+        self.batch_mode = batch_mode
+        # Hedging: publish stage 1 once stage 2 runs past this LLM latency
+        # quantile (None disables); a late answer is "replace"d or "drop"ped
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_s = hedge_min_s
+        self.hedge_late = hedge_late
+        # Stream stage-2 completions and send the emoji early as a
+        # `reaction_partial` event to connections that opted in
+        self.partial_events = partial_events
+        # Time base for cooldown gating; replay runs pass a simulated clock
+        self.clock = clock
+        # Detached late answers and leave staggers; cancelled on close()
+        self._background: Set["asyncio.Task[None]"] = set()
+
+    def _spawn(self, coro: Awaitable[None], label: str) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+
+        def _done(t: "asyncio.Task[None]") -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"[bot] background task failed task={label} err={t.exception()}")
+
+        task.add_done_callback(_done)
+
+    @property
+    def background_tasks(self) -> int:
+        return len(self._background)
+
+    async def close(self) -> None:
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stage1_react(self, bot: Bot, features: ChunkFeatures, rng: Optional[random.Random] = None) -> dict:
+        """Generate a quick, local reaction (Stage-1) without model calls.
+        The bucket and emoji come from the shared chunk features; the bot's
+        stance and domain only pick the phrase.
+        """
+        phrase = pick_phrase(bot.personality.stance, features.bucket, bot.personality.domain, rng)
+
+        # Stage-1 no longer computes any score delta
+        return {"emoji_unicode": features.emoji, "micro_phrase": phrase, "score_delta": 0}
+
+    def _plan(self, rng: random.Random, features: ChunkFeatures, bot: Bot) -> str:
+        """Decide up front how a bot handles this chunk: skip, stage1 or stage2."""
+        # suppression: use configured probability to ignore entirely
+        if rng.random() < 0.30:
+            return "skip"
+        # Questions and exclamations (weighted per category) escalate more
+        # often, and so do bots whose domain the chunk leans toward
+        escalate = 0.5 + 0.5 * features.salience + features.affinity_tilt(bot.personality.domain)
+        if rng.random() < min(0.9, max(0.1, escalate)):
+            return "stage2"
+        # running supression prob again to increase randomness
+        if rng.random() < 0.65:
+            return "skip"
+        return "stage1"
+
+    async def _stage2(
+        self,
+        room_id: str,
+        bot: Bot,
+        stage2_input: str,
+        timeout_s: float,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Optional[dict]:
+        if timeout_s <= 0:
+            return None
+
+        async def _call() -> Optional[dict]:
+            if not get_reaction_backend().uses_llm:
+                # Local backends don't spend provider quota
+                return await bot.generateReaction(stage2_input, timeout_s=timeout_s, on_partial=on_partial)
+            tokens = estimate_tokens(bot.system_prompt, stage2_input, completion=60)
+            async with self.scheduler.llm_slot(room_id, tokens=tokens):
+                return await bot.generateReaction(stage2_input, timeout_s=timeout_s, on_partial=on_partial)
+
+        # The budget covers waiting for admission as well as the call itself
+        return await asyncio.wait_for(_call(), timeout=timeout_s)
+
+    async def _batch_stage2(
+        self, room_id: str, bots: List[Bot], stage2_input: str, timeout_s: float
+    ) -> Optional[Dict[str, dict]]:
+        """One audience-batch call for every bot that escalated on this chunk."""
+
+        async def _call() -> Optional[Dict[str, dict]]:
+            tokens = estimate_tokens(
+                *(bot.personality.description for bot in bots), stage2_input, completion=40 * len(bots)
+            )
+            async with self.scheduler.llm_slot(room_id, tokens=tokens):
+                return await generateAudienceReactions(bots, stage2_input, timeout_s=timeout_s)
+
+        try:
+            return await asyncio.wait_for(_call(), timeout=timeout_s)
+        except LLMOverloaded:
+            print(f"[bot] audience batch shed room={room_id} bots={len(bots)}")
+            return None
+        except Exception as e:
+            print(f"[bot] audience batch failed room={room_id} bots={len(bots)} err={e}")
+            return None
+
+    async def _llm_reaction(
+        self,
+        room_id: str,
+        bot: Bot,
+        stage2_input: str,
+        batch: Optional["asyncio.Task[Optional[Dict[str, dict]]]"],
+        deadline: float,
+        cache_key: Optional[str],
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Optional[dict]:
+        """Stage-2 answer from the batch or a per-bot call; cached on success."""
+        reaction = None
+        if batch is not None:
+            results = await batch
+            reaction = (results or {}).get(bot.id)
+        if reaction is None:
+            # No batch, or the batch failed/skipped this bot: per-bot call
+            # within whatever remains of the stage-2 budget
+            reaction = await self._stage2(
+                room_id, bot, stage2_input, deadline - asyncio.get_running_loop().time(), on_partial
+            )
+        if reaction is not None and self.cache is not None:
+            self.cache.put(cache_key, reaction)
+        return reaction
+
+    def _hedge_after_s(self) -> Optional[float]:
+        """Seconds to wait for stage 2 before publishing stage 1, or None (no hedging)."""
+        if self.hedge_quantile is None:
+            return None
+        observed = llm_metrics.latency_quantile(self.hedge_quantile)
+        return max(self.hedge_min_s, observed if observed is not None else self.hedge_min_s)
+
+    async def _compute_reaction(
+        self,
+        room_id: str,
+        bot: Bot,
+        features: ChunkFeatures,
+        tail_context: str,
+        plan: str,
+        batch: Optional["asyncio.Task[Optional[Dict[str, dict]]]"],
+        release_at: float,
+        delivery: _Delivery,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Tuple[Optional[dict], str, Optional["asyncio.Task[Optional[dict]]"]]:
+        """Return (reaction, source, late) with source one of
+        stage1/stage2/cache/shed/hedged.
+
+        Stage-2 calls hold an LLM slot; answers are cached per chunk text and
+        persona class so repeated short phrases skip the model. With hedging
+        on, stage 1 is computed up front and used if the model hasn't answered
+        by the hedge deadline (never earlier than the bot's release slot);
+        `late` is the still-running stage-2 task in that case. The hedge wait
+        used is recorded on `delivery`.
+        """
+        rng = delivery.rng
+        if plan == "skip":
+            return None, "none", None
+        if plan == "stage1":
+            return self.stage1_react(bot, features, rng), "stage1", None
+        cache_key = self._cache_key(bot, features)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key, rng)
+            if cached is not None:
+                return cached, "cache", None
+        loop = asyncio.get_running_loop()
+        timeout_s = get_reaction_data().stage2_timeout_s
+        deadline = loop.time() + timeout_s
+        # Include prior transcript tail to provide brief context
+        stage2_input = f"{tail_context}{features.text}"
+        llm = asyncio.create_task(
+            self._llm_reaction(room_id, bot, stage2_input, batch, deadline, cache_key, on_partial)
+        )
+
+        hedge_s = self._hedge_after_s()
+        delivery.hedge_after_s = hedge_s
+        if hedge_s is not None:
+            # Speculative stage 1, ready to go the moment the hedge fires
+            fallback = self.stage1_react(bot, features, rng)
+            hedge_at = max(loop.time() + hedge_s, release_at)
+            if hedge_at < deadline:
+                await asyncio.wait({llm}, timeout=hedge_at - loop.time())
+                if not llm.done():
+                    llm.add_done_callback(_consume_task_result)
+                    return fallback, "hedged", llm
+        try:
+            reaction = await llm
+            if reaction is not None:
+                return reaction, "stage2", None
+        except LLMOverloaded:
+            # Admission queue is full: answer locally instead of waiting
+            return self.stage1_react(bot, features, rng), "shed", None
+        except Exception:
+            pass
+        return self.stage1_react(bot, features, rng), "stage1", None
+
+    def _cache_has(self, bot: Bot, features: ChunkFeatures) -> bool:
+        return self.cache is not None and self.cache.contains(self._cache_key(bot, features))
+
+    def _cache_key(self, bot: Bot, features: ChunkFeatures) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            features.text,
+            bot.personality.stance,
+            bot.personality.domain,
+            bot.personality.description,
+        )
+
+    async def _one_bot_react(
+        self,
+        room_id: str,
+        bot: Bot,
+        features: ChunkFeatures,
+        tail_context: str,
+        plan: str,
+        batch: Optional["asyncio.Task[Optional[Dict[str, dict]]]"],
+        release_at: float,
+        delivery: _Delivery,
+    ) -> Optional[Tuple[float, float]]:
+        """React for one bot; return (published_at, score_delta) if anything went out."""
+        loop = asyncio.get_running_loop()
+        source = "none"
+        late = None
+        on_partial = None
+        if self.partial_events and self._wanted(room_id, PARTIAL_EVENT):
+            on_partial = self._partial_callback(room_id, bot, release_at, delivery)
+        try:
+            reaction, source, late = await self._compute_reaction(
+                room_id, bot, features, tail_context, plan, batch, release_at, delivery, on_partial
+            )
+        except Exception as e:
+            print(f"[bot] reaction ERROR room={room_id} bot={bot.id} err={e}")
+            reaction = {
+                "emoji_unicode": "❓",
+                "micro_phrase": "Hmm",
+                "score_delta": 0,
+            }
+        delivery.final = True
+        if delivery.partial_task is not None and not delivery.committed:
+            delivery.partial_task.cancel()
+        if not reaction:
+            print(f"[bot] NO REACTION room={room_id} bot={bot.id}")
+            return (delivery.published_at, 0.0) if delivery.committed else None
+
+        # Hold the reaction until its slot in the release schedule
+        delay = release_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if delivery.committed:
+            # The emoji already went out as a partial; keep it consistent
+            if delivery.emoji and reaction.get("emoji_unicode") != delivery.emoji:
+                reaction = {**reaction, "emoji_unicode": delivery.emoji}
+        elif not delivery.allowed:
+            print(f"[bot] reaction suppressed room={room_id} bot={bot.id}")
+            return None
+        else:
+            delivery.published_at = delivery.release_ts
+        print(f"[bot] publishing reaction room={room_id} bot={bot.id}")
+        await self._publish(room_id, bot, features, reaction, source, hedge_after_s=delivery.hedge_after_s)
+        if late is not None and self.hedge_late == "replace":
+            # The stage-1 placeholder is out; the model's answer follows it
+            # in the background, off the room's critical path
+            self._spawn(
+                self._publish_late(room_id, bot, features, reaction, late, delivery),
+                f"late_stage2:{room_id}:{bot.id}",
+            )
+            return delivery.published_at, _parse_delta(reaction.get("score_delta", 0))
+        bot.state.remember(features.text, reaction.get("emoji_unicode"), reaction.get("micro_phrase"))
+        return delivery.published_at, _parse_delta(reaction.get("score_delta", 0))
+
+    async def _publish_late(
+        self,
+        room_id: str,
+        bot: Bot,
+        features: ChunkFeatures,
+        placeholder: dict,
+        late: "asyncio.Task[Optional[dict]]",
+        delivery: _Delivery,
+    ) -> None:
+        """Publish a hedged bot's stage-2 answer if it lands within the
+        stage-2 budget, and fold its score delta into engagement."""
+        try:
+            late_reaction = await late
+        except Exception:
+            late_reaction = None
+        if not late_reaction:
+            bot.state.remember(features.text, placeholder.get("emoji_unicode"), placeholder.get("micro_phrase"))
+            return
+        print(f"[bot] publishing late stage-2 reaction room={room_id} bot={bot.id}")
+        await self._publish(
+            room_id, bot, features, late_reaction, "late_stage2", late=True,
+            hedge_after_s=delivery.hedge_after_s,
+        )
+        bot.state.remember(features.text, late_reaction.get("emoji_unicode"), late_reaction.get("micro_phrase"))
+        # The placeholder's reaction time was recorded with the chunk;
+        # only the model's score delta is still owed
+        delta = _parse_delta(late_reaction.get("score_delta", 0))
+        if delta:
+            self._apply_engagement(room_id, [bot], [(delivery.published_at, delta)], mark_reacted=False)
+
+    def _partial_callback(
+        self, room_id: str, bot: Bot, release_at: float, delivery: _Delivery
+    ) -> PartialCallback:
+        def _on_partial(fields: Dict[str, Any]) -> None:
+            emoji = fields.get("emoji_unicode")
+            if not isinstance(emoji, str) or not emoji:
+                return
+            if delivery.final or delivery.partial_task is not None:
+                return
+            delivery.emoji = emoji
+            delivery.partial_task = asyncio.create_task(
+                self._emit_partial(room_id, bot, release_at, delivery)
+            )
+
+        return _on_partial
+
+    async def _emit_partial(self, room_id: str, bot: Bot, release_at: float, delivery: _Delivery) -> None:
+        """Send the streamed emoji at the bot's release slot if the full
+        reaction isn't ready by then."""
+        delay = release_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if delivery.final or not delivery.allowed:
+            return
+        delivery.committed = True
+        delivery.published_at = delivery.release_ts
+        print(f"[bot] publishing partial reaction room={room_id} bot={bot.id}")
+        await self.event_bus.publish("bot:reaction_partial", {
+            "roomId": room_id,
+            "botId": bot.id,
+            "reaction": {"emoji_unicode": delivery.emoji},
+        })
+
+    def _wanted(self, room_id: str, event: str) -> bool:
+        """Whether some socket may have opted in to `event`. Only local sockets
+        are visible here; with a transport the viewers may be on other
+        workers, so the event is always published."""
+        return self.event_bus.transport is not None or self.ws_manager.has_opt_in(room_id, event)
+
+    async def _publish(
+        self,
+        room_id: str,
+        bot: Bot,
+        features: ChunkFeatures,
+        reaction: dict,
+        source: str,
+        late: bool = False,
+        hedge_after_s: Optional[float] = None,
+    ) -> None:
+        if self._wanted(room_id, DEBUG_EVENT):
+            await self._publish_debug(room_id, bot, features, reaction, source, hedge_after_s)
+        payload = {"roomId": room_id, "botId": bot.id, "reaction": reaction}
+        if late:
+            payload["late"] = True
+        await self.event_bus.publish("bot:reaction", payload)
+
+    async def _publish_debug(
+        self,
+        room_id: str,
+        bot: Bot,
+        features: ChunkFeatures,
+        reaction: dict,
+        source: str,
+        hedge_after_s: Optional[float] = None,
+    ) -> None:
+        # emit debug events about decision path
+        decision = {
+            "is_question": features.is_question,
+            "salience": round(features.salience, 3),
+            "escalated": source in ("stage2", "cache", "hedged", "late_stage2"),
+            "source": source,
+            "domain_affinity": round(features.domain_affinity.get(bot.personality.domain, 0.0), 3),
+            "timeout_s": get_reaction_data().stage2_timeout_s if source in ("stage2", "hedged", "late_stage2") else 0,
+        }
+        if source in ("hedged", "late_stage2"):
+            decision["hedge"] = {
+                "after_s": round(hedge_after_s or 0.0, 3),
+                "late_policy": self.hedge_late,
+            }
+        await self.event_bus.publish("bot:reaction_debug", {
+            "roomId": room_id,
+            "botId": bot.id,
+            "decision": decision,
+            "reaction": reaction,
+        })
+
+    def _apply_engagement(
+        self,
+        room_id: str,
+        bots: List[Bot],
+        outcomes: List[Any],
+        mark_reacted: bool = True,
+    ) -> None:
+        """Fold one chunk's reactions into the room's engagement table.
+
+        Last reaction times and score deltas for every bot that reacted are
+        applied in one vectorized step; bots that drop to the leave threshold
+        are removed together, and their leave events go out staggered in the
+        background.
+        """
+        table = self.room_manager.get_engagement(room_id)
+        # Bots that left mid-chunk are skipped (their slot may be reused)
+        reacted = [
+            i for i, outcome in enumerate(outcomes)
+            if isinstance(outcome, tuple) and outcome[0] is not None and bots[i].id in table
+        ]
+        if not reacted:
+            return
+        reacted_bots = [bots[i] for i in reacted]
+        slots = table.slots(reacted_bots)
+        if mark_reacted:
+            table.mark_reacted(slots, np.fromiter((outcomes[i][0] for i in reacted), np.float64, len(reacted)))
+        deltas = np.fromiter((outcomes[i][1] for i in reacted), np.float64, len(reacted))
+        scores, leaving = table.apply_deltas(slots, deltas)
+        table.sync_to_bots(reacted_bots, slots)
+        print(
+            f"[bot] engagement update room={room_id} bots={len(reacted)} "
+            f"mean={float(scores.mean()):.1f} min={float(scores.min()):.1f}"
+        )
+        if not leaving.any():
+            return
+        leavers = [(bot, float(score)) for bot, score, leave in zip(reacted_bots, scores, leaving) if leave]
+        # Leavers are out of the room before the next chunk; only their
+        # leave events are staggered, to avoid simultaneous exits
+        rng = self.room_manager.get_rng(room_id)
+        stagger = []
+        for bot, score in leavers:
+            print(f"[bot] engagement low, removing bot room={room_id} bot={bot.id} score={score}")
+            self.room_manager.remove_bot_from_room(room_id, bot.id)
+            stagger.append((bot.id, rng.uniform(0.05, 0.25)))
+        self._spawn(self._publish_leaves(room_id, stagger), f"leaves:{room_id}")
+
+    async def _publish_leaves(self, room_id: str, stagger: List[Tuple[str, float]]) -> None:
+        for bot_id, delay in stagger:
+            await asyncio.sleep(delay)
+            await self.event_bus.publish("bot:leave", {"roomId": room_id, "botId": bot_id})
+        if not self.room_manager.get_service_bots_in_room(room_id):
+            # The last bot is gone: nothing left to react, so stop claiming
+            # the room's state (its sockets may still hold it)
+            print(f"[bot] last bot left, releasing room state room={room_id}")
+            await self.event_bus.release_room(room_id, role="state")
+
+    async def run(self, room_id: str, features: ChunkFeatures, tail_context: str) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        bots_in_room = self.room_manager.get_service_bots_in_room(room_id)
+        # Every random decision for the chunk is drawn here, in bot order, from
+        # the room's RNG; each bot also gets a child RNG for what it draws
+        # later (phrases, cache jitter), so concurrent completion order can't
+        # change the outcome of a seeded run.
+        rng = self.room_manager.get_rng(room_id)
+        offsets = self.scheduler.release_schedule(len(bots_in_room), rng)
+        plans = [self._plan(rng, features, bot) for bot in bots_in_room]
+        rolls = np.fromiter((rng.random() for _ in bots_in_room), np.float64, len(bots_in_room))
+        bot_rngs = [random.Random(rng.getrandbits(64)) for _ in bots_in_room]
+        # Cooldown and probability gates for every bot at its release slot
+        table = self.room_manager.get_engagement(room_id)
+        slots = table.slots(bots_in_room)
+        release_ts = self.clock() + np.asarray(offsets, dtype=np.float64)
+        allowed = table.gate(slots, release_ts, rolls).tolist()
+
+        batch = None
+        # Bots answered from the cache don't need a seat in the batch call
+        escalating = [
+            bot for bot, plan in zip(bots_in_room, plans)
+            if plan == "stage2" and not self._cache_has(bot, features)
+        ]
+        if self.batch_mode and len(escalating) > 1:
+            batch = asyncio.create_task(self._batch_stage2(
+                room_id,
+                escalating,
+                f"{tail_context}{features.text}",
+                get_reaction_data().stage2_timeout_s,
+            ))
+
+        tasks = []
+        for i, bot in enumerate(bots_in_room):
+            print(f"[bot] start reaction room={room_id} bot={bot.id}")
+            delivery = _Delivery(allowed[i], float(release_ts[i]), bot_rngs[i])
+            tasks.append(self._one_bot_react(
+                room_id, bot, features, tail_context, plans[i], batch, started + offsets[i], delivery
+            ))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for bot, result in zip(bots_in_room, results):
+            if isinstance(result, BaseException):
+                print(f"[bot] reaction task failed room={room_id} bot={bot.id} err={result}")
+        try:
+            self._apply_engagement(room_id, bots_in_room, results)
+        except Exception as e:
+            print(f"[bot] engagement update error room={room_id} err={e}")
+
+        latency = loop.time() - started
+        self.scheduler.record_latency(room_id, latency)
+        print(f"[bot] chunk reactions done room={room_id} bots={len(bots_in_room)} latency={latency:.2f}s")
+
+        # Append transcript AFTER reactions are published to avoid duplicating
+        # the current chunk when constructing Stage-2 context (tail + chunk)
+        try:
+            self.room_manager.append_transcript(room_id, features.text)
+        except Exception:
+            pass
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from app.core.metrics import quantile
+from app.services.llm_admission import (
+    PRIORITY_REACTION,
+    LLMAdmissionController,
+    get_llm_admission,
+)
+
+
+class ReactionScheduler:
+    """Schedules per-bot reactions for a chunk so they run concurrently.
+
+    - release_schedule(n): jittered delivery offsets spread over `window_s`
+    - llm_slot(room_id): bounds concurrent LLM calls per room, then goes
+      through the process-wide admission controller (reaction class)
+    - record_latency(room_id, seconds): chunk → last reaction latency samples
+    - forget_room(room_id): drop a retired room's latency samples
+
+    A room's semaphore only exists while calls hold or wait for it, so
+    per-room state doesn't accumulate on a long-running server.
+    """
+
+    def __init__(
+        self,
+        window_s: float = 3.0,
+        room_llm_concurrency: int = 4,
+        latency_samples: int = 200,
+        admission: Optional[LLMAdmissionController] = None,
+    ) -> None:
+        self.window_s = max(0.0, float(window_s))
+        self.room_llm_concurrency = max(1, int(room_llm_concurrency))
+        self.admission = admission or get_llm_admission()
+        self._room_llm: Dict[str, asyncio.Semaphore] = {}
+        # Calls holding or waiting for each room's semaphore
+        self._room_llm_users: Dict[str, int] = {}
+        self._latency_samples = latency_samples
+        self._room_latency: Dict[str, Deque[float]] = {}
+
+    def release_schedule(self, count: int, rng: Optional[random.Random] = None) -> List[float]:
+        """Return `count` delivery offsets (seconds from chunk start).
+
+        The window is split into equal slots with one jittered release per slot;
+        slots are shuffled so the same bot is not always first to react.
+        """
+        if count <= 0:
+            return []
+        slot = self.window_s / count
+        rng = rng or random  # type: ignore[assignment]
+        offsets = [slot * (i + rng.uniform(0.1, 0.9)) for i in range(count)]
+        rng.shuffle(offsets)
+        return offsets
+
+    @asynccontextmanager
+    async def llm_slot(self, room_id: str, tokens: int = 0) -> AsyncIterator[None]:
+        """Raises LLMOverloaded when the reaction queue is full (caller sheds)."""
+        room_sem = self._room_llm.get(room_id)
+        if room_sem is None:
+            room_sem = asyncio.Semaphore(self.room_llm_concurrency)
+            self._room_llm[room_id] = room_sem
+        self._room_llm_users[room_id] = self._room_llm_users.get(room_id, 0) + 1
+        try:
+            async with room_sem:
+                async with self.admission.slot(PRIORITY_REACTION, tokens=tokens):
+                    yield
+        finally:
+            users = self._room_llm_users[room_id] - 1
+            if users:
+                self._room_llm_users[room_id] = users
+            else:
+                # Nobody holds or waits: the semaphore is back to full, drop it
+                self._room_llm_users.pop(room_id, None)
+                self._room_llm.pop(room_id, None)
+
+    def record_latency(self, room_id: str, seconds: float) -> None:
+        samples = self._room_latency.get(room_id)
+        if samples is None:
+            samples = deque(maxlen=self._latency_samples)
+            self._room_latency[room_id] = samples
+        samples.append(seconds)
+
+    def forget_room(self, room_id: str) -> None:
+        self._room_latency.pop(room_id, None)
+
+    def stats(self) -> dict:
+        rooms = {}
+        for room_id, samples in self._room_latency.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            rooms[room_id] = {
+                "chunks": len(ordered),
+                "last_s": round(samples[-1], 3),
+                "p50_s": round(quantile(ordered, 0.5), 3),
+                "p95_s": round(quantile(ordered, 0.95), 3),
+                "max_s": round(ordered[-1], 3),
+            }
+        return {"window_s": self.window_s, "rooms": rooms}
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+
+from app.core.metrics import quantile
+from app.services.chunk_analysis import analyze_chunk
+
+if TYPE_CHECKING:
+    from app.services.reaction_pipeline import ReactionPipeline
+    from app.state.room_manager import RoomManager
+
+
+QUEUE_POLICIES = ("merge", "latest", "fifo")
+
+
+class _PendingChunk:
+    __slots__ = ("text", "flush_meta", "enqueued_at", "skipped")
+
+    def __init__(self, text: str, flush_meta: dict, enqueued_at: float) -> None:
+        self.text = text
+        self.flush_meta = flush_meta
+        self.enqueued_at = enqueued_at
+        # Older chunks folded into this one without reactions of their own;
+        # they still go into the room transcript (and stage-2 context) first
+        self.skipped: List[str] = []
+
+
+class _RoomQueue:
+    def __init__(self, lag_samples: int) -> None:
+        self.pending: Deque[_PendingChunk] = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.busy = False
+        self.processed = 0
+        self.merged = 0
+        self.dropped = 0
+        self.lag: Deque[float] = deque(maxlen=lag_samples)
+
+
+class ReactionWorkers:
+    """One long-lived reaction worker per room, fed by a bounded chunk queue.
+
+    Chunks for a room are reacted to one at a time, in order. While a chunk
+    is in flight, newer chunks wait in the room's queue and are coalesced
+    according to `policy`:
+
+    - merge:  pending chunks are joined into one chunk; past `max_chars`
+              only the tail gets reactions and the head is added to the
+              transcript without them (nothing is lost)
+    - latest: only the newest pending chunk gets reactions; older ones are
+              added to the transcript without reactions
+    - fifo:   up to `max_pending` chunks wait; beyond that the oldest is
+              added to the transcript without reactions
+
+    Workers start on the first chunk and exit after `idle_s` without input.
+    """
+
+    def __init__(
+        self,
+        pipeline: "ReactionPipeline",
+        room_manager: "RoomManager",
+        policy: str = "merge",
+        max_pending: int = 4,
+        max_chars: int = 1000,
+        idle_s: float = 60.0,
+        lag_samples: int = 200,
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            print(f"[rooms] unknown reaction queue policy {policy!r}; using merge")
+            policy = "merge"
+        self.pipeline = pipeline
+        self.room_manager = room_manager
+        self.policy = policy
+        self.max_pending = max(1, int(max_pending))
+        self.max_chars = max(1, int(max_chars))
+        self.idle_s = idle_s
+        self._lag_samples = lag_samples
+        self._rooms: Dict[str, _RoomQueue] = {}
+
+    def submit(self, room_id: str, text: str, flush_meta: Optional[dict] = None) -> None:
+        """Queue a transcript chunk for the room's worker (never blocks)."""
+        loop = asyncio.get_running_loop()
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = _RoomQueue(self._lag_samples)
+        chunk = _PendingChunk(text, flush_meta or {}, loop.time())
+
+        if room.pending and self.policy == "merge":
+            last = room.pending[-1]
+            merged = f"{last.text} {text}"
+            if len(merged) > self.max_chars:
+                # Keep the newest text, cut at a word boundary when possible
+                cut = len(merged) - self.max_chars
+                space = merged.find(" ", cut)
+                if 0 <= space < len(merged) - 1:
+                    cut = space + 1
+                last.skipped.append(merged[:cut].rstrip())
+                merged = merged[cut:]
+            last.text = merged
+            # The newest text ends the merged chunk, so its punctuation flags win
+            last.flush_meta = chunk.flush_meta
+            room.merged += 1
+        elif room.pending and self.policy == "latest":
+            stale = room.pending.pop()
+            chunk.skipped = stale.skipped + [stale.text]
+            room.pending.append(chunk)
+            room.dropped += 1
+        else:
+            room.pending.append(chunk)
+            if len(room.pending) > self.max_pending:
+                oldest = room.pending.popleft()
+                room.pending[0].skipped = oldest.skipped + [oldest.text] + room.pending[0].skipped
+                room.dropped += 1
+
+        room.wakeup.set()
+        if room.task is None or room.task.done():
+            room.task = asyncio.create_task(self._run(room_id, room))
+
+    async def _run(self, room_id: str, room: _RoomQueue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not room.pending:
+                room.wakeup.clear()
+                try:
+                    await asyncio.wait_for(room.wakeup.wait(), timeout=self.idle_s)
+                except asyncio.TimeoutError:
+                    if not room.pending:
+                        break
+                continue
+            chunk = room.pending.popleft()
+            room.lag.append(loop.time() - chunk.enqueued_at)
+            room.busy = True
+            try:
+                await self._process(room_id, chunk)
+            except Exception as e:
+                print(f"[bot] reaction worker error room={room_id} err={e}")
+            finally:
+                room.busy = False
+                room.processed += 1
+        # Idle: retire the worker (a later submit starts a fresh one) along
+        # with the scheduler's per-room state
+        if self._rooms.get(room_id) is room:
+            self._rooms.pop(room_id, None)
+            self.pipeline.scheduler.forget_room(room_id)
+
+    async def _process(self, room_id: str, chunk: _PendingChunk) -> None:
+        for text in chunk.skipped:
+            self.room_manager.append_transcript(room_id, text)
+        # Tail context is read when the chunk starts, after the previous
+        # chunk's text was appended, so it never misses or repeats a chunk
+        tail_context = self.room_manager.get_transcript_tail_chars(room_id, 150)
+        # Chunk-level features (keyword scores, buckets, weights) are computed
+        # once here and shared by every bot; per-bot logic only applies stance and domain.
+        features = analyze_chunk(chunk.text, chunk.flush_meta, self.room_manager.get_category(room_id))
+        await self.pipeline.run(room_id, features, tail_context)
+
+    def queue_depth(self, room_id: str) -> int:
+        room = self._rooms.get(room_id)
+        return len(room.pending) if room else 0
+
+    async def close(self) -> None:
+        tasks = [room.task for room in self._rooms.values() if room.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._rooms.clear()
+
+    def stats(self) -> dict:
+        rooms = {}
+        for room_id, room in self._rooms.items():
+            lag = sorted(room.lag)
+            rooms[room_id] = {
+                "queue_depth": len(room.pending),
+                "busy": room.busy,
+                "processed": room.processed,
+                "merged": room.merged,
+                "dropped": room.dropped,
+                "lag_last_s": round(room.lag[-1], 3) if room.lag else None,
+                "lag_p50_s": round(quantile(lag, 0.5), 3) if lag else None,
+                "lag_p95_s": round(quantile(lag, 0.95), 3) if lag else None,
+            }
+        return {
+            "policy": self.policy,
+            "max_pending": self.max_pending,
+            "max_chars": self.max_chars,
+            # Late stage-2 answers and leave staggers still in flight
+            "background_tasks": self.pipeline.background_tasks,
+            "rooms": rooms,
+        }
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.bot import Bot
+from app.services.reaction_data import compute_reaction_probability
+
+
+# Engagement rules (previously applied per bot after each reaction)
+DELTA_LIMIT = 5.0
+MAX_SCORE = 10.0
+LEAVE_SCORE = -10.0
+
+
+class EngagementTable:
+    """Column store of per-bot engagement state for one room.
+
+    Each bot gets a slot; scores, cooldowns, last reaction times and reaction
+    probabilities live in NumPy columns indexed by slot, so gating and score
+    updates for every bot in a chunk are one vectorized step. Slots of bots
+    that leave are reused; the columns double when full.
+
+    The bot's `BotState` mirrors the table (scores and last reaction time are
+    written back after each update) for code that reads the bot directly.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        capacity = max(1, int(capacity))
+        self.scores = np.zeros(capacity, dtype=np.float64)
+        self.cooldowns = np.zeros(capacity, dtype=np.float64)
+        self.last_reaction_ts = np.zeros(capacity, dtype=np.float64)
+        self.probs = np.zeros(capacity, dtype=np.float64)
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, bot_id: object) -> bool:
+        return bot_id in self._slots
+
+    def _grow(self) -> None:
+        old = len(self.scores)
+        for name in ("scores", "cooldowns", "last_reaction_ts", "probs"):
+            column = getattr(self, name)
+            grown = np.zeros(old * 2, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self._free.extend(range(old * 2 - 1, old - 1, -1))
+
+    def add(self, bot: Bot) -> int:
+        """Register a bot (or refresh its row) from its current BotState."""
+        slot = self._slots.get(bot.id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slots[bot.id] = slot
+        state = bot.state
+        self.scores[slot] = state.engagementScore
+        self.cooldowns[slot] = state.cooldownSeconds
+        self.last_reaction_ts[slot] = state.lastReactionTs
+        self.probs[slot] = compute_reaction_probability(state.reactionProbability, bot.personality.stance)
+        return slot
+
+    def remove(self, bot_id: str) -> None:
+        slot = self._slots.pop(bot_id, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    def slots(self, bots: Sequence[Bot]) -> np.ndarray:
+        """Slot index for each bot, registering unknown bots on the way."""
+        return np.fromiter(
+            (self._slots[b.id] if b.id in self._slots else self.add(b) for b in bots),
+            dtype=np.intp,
+            count=len(bots),
+        )
+
+    def gate(self, slots: np.ndarray, release_ts: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+        """Cooldown and reaction-probability gate for every bot at its release time."""
+        cooled = release_ts - self.last_reaction_ts[slots] >= self.cooldowns[slots]
+        return cooled & (rolls <= self.probs[slots])
+
+    def mark_reacted(self, slots: np.ndarray, ts: np.ndarray) -> None:
+        self.last_reaction_ts[slots] = ts
+
+    def apply_deltas(self, slots: np.ndarray, deltas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply model score deltas; return (new scores, leave mask).
+
+        Deltas are rounded and clamped to [-5, 5]; negative deltas are made
+        one point stricter (-1 -> -2, ..., -5 stays -5). Scores are capped at
+        10 and a bot at or below -10 leaves.
+        """
+        deltas = np.clip(np.rint(deltas), -DELTA_LIMIT, DELTA_LIMIT)
+        deltas = np.where(deltas < 0, np.maximum(-DELTA_LIMIT, deltas - 1), deltas)
+        scores = np.minimum(self.scores[slots] + deltas, MAX_SCORE)
+        self.scores[slots] = scores
+        return scores, scores <= LEAVE_SCORE
+
+    def sync_to_bots(self, bots: Sequence[Bot], slots: np.ndarray) -> None:
+        """Write scores and last reaction times back to the bots' BotState
+        and append (timestamp, score) to their engagement history."""
+        for bot, score, ts in zip(bots, self.scores[slots].tolist(), self.last_reaction_ts[slots].tolist()):
+            bot.state.engagementScore = score
+            bot.state.lastReactionTs = ts
+            bot.state.engagementHistory.append((ts, score))
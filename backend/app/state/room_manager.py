@@ -1,11 +1,25 @@
 from __future__ import annotations
+import random
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Deque, Tuple, Optional, List, Any
 
+from app.core.config import get_settings
 from app.services.bot import Bot as ServiceBot
 from app.schemas.room import Bot as SchemaBot, Persona as SchemaPersona
+from app.state.engagement import EngagementTable
+
+def room_rng(room_id: str, seed: Optional[int] = None) -> random.Random:
+    """RNG for a room's reaction decisions.
+
+    With a seed (REACTION_SEED), each room's stream is derived from the seed
+    and the room id, so runs are reproducible and rooms don't share draws.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{room_id}")
+
 
 @dataclass
 class Room:
@@ -17,6 +31,8 @@ class Room:
     category: Optional[str] = None
     duration_seconds: Optional[int] = None
     persona_pool: Optional[List[Dict[str, Any]]] = None
+    engagement: EngagementTable = field(default_factory=EngagementTable)
+    rng: random.Random = field(default_factory=random.Random)
 
 class RoomManager:
     def __init__(self) -> None:
@@ -25,7 +41,7 @@ class RoomManager:
     def ensure_room(self, room_id: str) -> Room:
         room = self._rooms.get(room_id)
         if room is None:
-            room = Room(id=room_id)
+            room = Room(id=room_id, rng=room_rng(room_id, get_settings().reaction_seed))
             self._rooms[room_id] = room
         return room
 
@@ -81,8 +97,7 @@ class RoomManager:
         if not pool:
             return None
         try:
-            import random as _random
-            return _random.choice(pool)
+            return room.rng.choice(pool)
         except Exception:
             # Fallback to first element if random fails
             return pool[0] if pool else None
@@ -90,13 +105,25 @@ class RoomManager:
     def add_bot_to_room(self, room_id: str, bot: ServiceBot) -> None:
         room = self.ensure_room(room_id)
         room.bots[bot.id] = bot
+        room.engagement.add(bot)
         room.updated_at = datetime.now(timezone.utc)
 
     def remove_bot_from_room(self, room_id: str, bot_id: str) -> None:
         room = self.ensure_room(room_id)
         room.bots.pop(bot_id, None)
+        room.engagement.remove(bot_id)
         room.updated_at = datetime.now(timezone.utc)
 
+    def get_rng(self, room_id: str) -> random.Random:
+        return self.ensure_room(room_id).rng
+
+    def seed_room(self, room_id: str, seed: int) -> None:
+        """Restart the room's decision stream from `seed` (e.g. for a replay)."""
+        self.ensure_room(room_id).rng = room_rng(room_id, seed)
+
+    def get_engagement(self, room_id: str) -> EngagementTable:
+        return self.ensure_room(room_id).engagement
+
     def append_transcript(self, room_id: str, text: str) -> None:
         room = self.ensure_room(room_id)
         room.transcript.append((datetime.now(timezone.utc), text))
@@ -1,27 +1,155 @@
 from __future__ import annotations
 
-from typing import Dict, Set
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
 import asyncio
+import json
+import uuid
 
 from fastapi import WebSocket
 
+from app.core.metrics import quantile
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None  # type: ignore[assignment]
+
+
+# Events a lagging client can miss without losing state: dropped first when
+# its outbound queue is full. Everything else (reaction, join, leave,
+# coach_feedback, ...) is critical.
+NON_CRITICAL_EVENTS = frozenset({"reaction_debug", "reaction_partial", "transcript"})
+# WebSocket close code for evicted slow consumers ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def encode_json(message: object) -> str:
+    """Compact JSON text for a WebSocket frame (orjson when available).
+
+    Broadcasts encode once and send the same string to every socket.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(message).decode("utf-8")
+        except TypeError:
+            # e.g. non-str dict keys; the stdlib encoder handles those
+            pass
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _is_critical(frame: object) -> bool:
+    messages = frame if isinstance(frame, list) else [frame]
+    return any(
+        not isinstance(m, dict) or m.get("event") not in NON_CRITICAL_EVENTS for m in messages
+    )
+
+
+class _Connection:
+    """One socket's outbound side: a bounded frame queue and its writer task."""
+
+    __slots__ = (
+        "ws", "id", "room_id", "opt_in", "queue", "has_items", "writer",
+        "sent", "dropped", "over_since", "lag", "max_lag",
+    )
+
+    def __init__(self, ws: WebSocket, room_id: str, lag_samples: int) -> None:
+        self.ws = ws
+        # Names the connection to other workers (e.g. a forwarded state_request)
+        self.id = uuid.uuid4().hex
+        self.room_id = room_id
+        self.opt_in: Set[str] = set()
+        # (text, critical, enqueued_at)
+        self.queue: Deque[Tuple[str, bool, float]] = deque()
+        self.has_items = asyncio.Event()
+        self.writer: Optional["asyncio.Task[None]"] = None
+        self.sent = 0
+        self.dropped = 0
+        # Loop time when the queue went over its limit with nothing droppable
+        self.over_since: Optional[float] = None
+        self.lag: Deque[float] = deque(maxlen=lag_samples)
+        self.max_lag = 0.0
+
+    def oldest_queued_s(self, now: float) -> float:
+        """Age of the oldest frame still waiting to be sent (0 if none).
+
+        Unlike send lag, this keeps growing for a client whose sends are
+        stuck, which is what eviction is about."""
+        return now - self.queue[0][2] if self.queue else 0.0
+
+    def stats(self, now: float) -> dict:
+        lag = sorted(self.lag)
+        return {
+            "room": self.room_id,
+            "queue_depth": len(self.queue),
+            "oldest_queued_ms": round(1000 * self.oldest_queued_s(now), 1),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_last_ms": round(1000 * self.lag[-1], 1) if self.lag else None,
+            "lag_p95_ms": round(1000 * quantile(lag, 0.95), 1) if lag else None,
+            "lag_max_ms": round(1000 * self.max_lag, 1),
+        }
+
 
 class ConnectionManager:
     """Tracks WebSocket connections per room and provides broadcast helpers.
 
-    In-memory and single-process only (sufficient for MVP).
+    In-memory and per process (see the event bus transport for multiple
+    workers). Some events are opt-in per connection (e.g. `reaction_partial`,
+    `reaction_debug`); those are only sent to sockets that subscribed to
+    them. Every broadcast is encoded once (`encode_json`) and the same text
+    goes to all its sockets.
+
+    Broadcasts never wait on a client: each connection has its own bounded
+    queue (`max_queue` frames) drained by a writer task, and broadcasting
+    only enqueues. When a queue is full, non-critical frames (debug,
+    partials, transcript) are dropped first, oldest first; a client that
+    stays over its limit with only critical frames queued for `evict_after_s`
+    (or reaches twice the limit) is disconnected as a slow consumer.
+
+    `broadcast_batched` collects a room's messages for `tick_s` and sends them
+    as one frame (a JSON array of envelopes; a lone message goes out as a
+    plain envelope). Each distinct frame is serialized once per tick.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        tick_s: float = 0.05,
+        max_queue: int = 256,
+        evict_after_s: float = 5.0,
+        lag_samples: int = 100,
+    ) -> None:
         self._room_to_sockets: Dict[str, Set[WebSocket]] = {}
+        self._conns: Dict[WebSocket, _Connection] = {}
+        self._by_id: Dict[str, _Connection] = {}
+        self.tick_s = tick_s
+        self.max_queue = max(1, int(max_queue))
+        self.evict_after_s = evict_after_s
+        self._lag_samples = lag_samples
+        # room -> [(message, opt_in)] waiting for the next tick
+        self._outbox: Dict[str, List[Tuple[dict, Optional[str]]]] = {}
+        self._flushers: Dict[str, "asyncio.Task[None]"] = {}
+        self.frames_sent = 0
+        self.messages_batched = 0
+        self.frames_dropped = 0
+        self.evicted = 0
 
     async def connect(self, room_id: str, websocket: WebSocket) -> None:
         await websocket.accept()
         if room_id not in self._room_to_sockets:
             self._room_to_sockets[room_id] = set()
         self._room_to_sockets[room_id].add(websocket)
+        conn = _Connection(websocket, room_id, self._lag_samples)
+        conn.writer = asyncio.create_task(self._write(conn))
+        self._conns[websocket] = conn
+        self._by_id[conn.id] = conn
 
     def disconnect(self, room_id: str, websocket: WebSocket) -> None:
+        conn = self._conns.pop(websocket, None)
+        if conn is not None:
+            self._by_id.pop(conn.id, None)
+        if conn is not None and conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
         sockets = self._room_to_sockets.get(room_id)
         if not sockets:
             return
@@ -30,18 +158,192 @@ class ConnectionManager:
             # Cleanup empty room sets to avoid unbounded growth
             self._room_to_sockets.pop(room_id, None)
 
-    async def broadcast_json(self, room_id: str, message: dict) -> None:
-        sockets = list(self._room_to_sockets.get(room_id, set()))
-        if not sockets:
+    def has_sockets(self, room_id: str) -> bool:
+        return bool(self._room_to_sockets.get(room_id))
+
+    def connection_id(self, websocket: WebSocket) -> Optional[str]:
+        conn = self._conns.get(websocket)
+        return conn.id if conn is not None else None
+
+    def set_opt_in(self, websocket: WebSocket, events: Iterable[str], enabled: bool = True) -> None:
+        conn = self._conns.get(websocket)
+        if conn is None:
             return
+        if enabled:
+            conn.opt_in.update(events)
+        else:
+            conn.opt_in.difference_update(events)
 
-        async def _send(ws: WebSocket) -> None:
+    def has_opt_in(self, room_id: str, event: str) -> bool:
+        """True if any socket in the room subscribed to the opt-in `event`."""
+        conns = self._conns
+        return any(
+            event in conns[ws].opt_in for ws in self._room_to_sockets.get(room_id, ()) if ws in conns
+        )
+
+    def _opted_in(self, ws: WebSocket) -> Set[str]:
+        conn = self._conns.get(ws)
+        return conn.opt_in if conn is not None else set()
+
+    def _enqueue(self, ws: WebSocket, text: str, critical: bool) -> None:
+        conn = self._conns.get(ws)
+        if conn is None:
+            return
+        now = asyncio.get_running_loop().time()
+        queue = conn.queue
+        if len(queue) >= self.max_queue:
+            # Make room by dropping the oldest non-critical frame
+            victim = next((i for i, item in enumerate(queue) if not item[1]), None)
+            if victim is not None:
+                del queue[victim]
+                conn.dropped += 1
+                self.frames_dropped += 1
+            elif not critical:
+                conn.dropped += 1
+                self.frames_dropped += 1
+                return
+            else:
+                if conn.over_since is None:
+                    conn.over_since = now
+                if now - conn.over_since >= self.evict_after_s or len(queue) >= 2 * self.max_queue:
+                    self._evict(conn)
+                    return
+        queue.append((text, critical, now))
+        conn.has_items.set()
+
+    def _evict(self, conn: _Connection) -> None:
+        self.evicted += 1
+        oldest_s = conn.oldest_queued_s(asyncio.get_running_loop().time())
+        print(
+            f"[ws] evicting slow consumer room={conn.room_id} "
+            f"queued={len(conn.queue)} oldest_queued_ms={1000 * oldest_s:.0f} "
+            f"lag_max_ms={1000 * conn.max_lag:.0f}"
+        )
+        self.disconnect(conn.room_id, conn.ws)
+
+        async def _close() -> None:
             try:
-                await ws.send_json(message)
+                await conn.ws.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+
+        asyncio.create_task(_close())
+
+    async def _write(self, conn: _Connection) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not conn.queue:
+                conn.has_items.clear()
+                await conn.has_items.wait()
+                continue
+            text, _, enqueued_at = conn.queue.popleft()
+            try:
+                await conn.ws.send_text(text)
             except Exception:
                 # If sending fails, drop the socket from the room
-                self.disconnect(room_id, ws)
+                self.disconnect(conn.room_id, conn.ws)
+                return
+            conn.sent += 1
+            lag = loop.time() - enqueued_at
+            conn.lag.append(lag)
+            conn.max_lag = max(conn.max_lag, lag)
+            if conn.over_since is not None and len(conn.queue) < self.max_queue:
+                conn.over_since = None
+
+    async def send_to(self, websocket: WebSocket, message: dict) -> None:
+        """Send `message` to one connection through its outbound queue, so
+        replies (e.g. `ready`, `state`) never race the connection's writer."""
+        self._enqueue(websocket, encode_json(message), _is_critical(message))
+
+    async def send_to_connection(self, conn_id: str, message: dict) -> bool:
+        """`send_to` by connection id; False if the connection isn't on this
+        worker (or is gone)."""
+        conn = self._by_id.get(conn_id)
+        if conn is None:
+            return False
+        await self.send_to(conn.ws, message)
+        return True
 
-        await asyncio.gather(*(_send(ws) for ws in sockets), return_exceptions=True)
+    async def broadcast_json(self, room_id: str, message: dict, opt_in: Optional[str] = None) -> None:
+        sockets = list(self._room_to_sockets.get(room_id, set()))
+        if opt_in is not None:
+            sockets = [ws for ws in sockets if opt_in in self._opted_in(ws)]
+        if not sockets:
+            return
+        text = encode_json(message)
+        critical = _is_critical(message)
+        for ws in sockets:
+            self._enqueue(ws, text, critical)
+
+    async def broadcast_batched(self, room_id: str, message: dict, opt_in: Optional[str] = None) -> None:
+        """Queue `message` for the room's next tick frame (immediate if tick_s <= 0)."""
+        if self.tick_s <= 0:
+            await self.broadcast_json(room_id, message, opt_in=opt_in)
+            return
+        if room_id not in self._room_to_sockets:
+            return
+        self._outbox.setdefault(room_id, []).append((message, opt_in))
+        if room_id not in self._flushers:
+            self._flushers[room_id] = asyncio.create_task(self._flush_after_tick(room_id))
+
+    async def _flush_after_tick(self, room_id: str) -> None:
+        try:
+            await asyncio.sleep(self.tick_s)
+        finally:
+            self._flushers.pop(room_id, None)
+        await self._flush(room_id)
+
+    async def _flush(self, room_id: str) -> None:
+        pending = self._outbox.pop(room_id, None)
+        sockets = list(self._room_to_sockets.get(room_id, set()))
+        if not pending or not sockets:
+            return
+        self.messages_batched += len(pending)
+        # Sockets with the same opt-ins get the same frame: serialize it once
+        frames: Dict[Tuple[int, ...], Tuple[str, bool]] = {}
+        for ws in sockets:
+            opts = self._opted_in(ws)
+            key = tuple(i for i, (_, opt) in enumerate(pending) if opt is None or opt in opts)
+            if not key:
+                continue
+            if key not in frames:
+                messages = [pending[i][0] for i in key]
+                frame = messages[0] if len(messages) == 1 else messages
+                frames[key] = (encode_json(frame), _is_critical(frame))
+            self._enqueue(ws, *frames[key])
+            self.frames_sent += 1
 
+    async def close(self, timeout_s: float = 2.0) -> None:
+        """Flush whatever is still waiting for a tick, give writers
+        `timeout_s` to drain, then stop them."""
+        for task in list(self._flushers.values()):
+            task.cancel()
+        self._flushers.clear()
+        for room_id in list(self._outbox):
+            await self._flush(room_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        while any(c.queue for c in self._conns.values()) and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        writers = [c.writer for c in self._conns.values() if c.writer is not None]
+        for task in writers:
+            task.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
 
+    def stats(self) -> dict:
+        conns = list(self._conns.values())
+        now = asyncio.get_running_loop().time()
+        return {
+            "rooms": len(self._room_to_sockets),
+            "connections": len(conns),
+            "tick_s": self.tick_s,
+            "max_queue": self.max_queue,
+            "frames_sent": self.frames_sent,
+            "messages_batched": self.messages_batched,
+            "frames_dropped": self.frames_dropped,
+            "evicted": self.evicted,
+            "queued": sum(len(c.queue) for c in conns),
+            "lag_max_ms": round(1000 * max((c.max_lag for c in conns), default=0.0), 1),
+            "oldest_queued_ms": round(1000 * max((c.oldest_queued_s(now) for c in conns), default=0.0), 1),
+            "clients": [c.stats(now) for c in conns],
+        }
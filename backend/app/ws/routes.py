@@ -6,11 +6,28 @@ import time
 
 from app.ws.manager import ConnectionManager
 from app.events.bus import EventBus
+from app.state.room_manager import RoomManager
 
 
 router = APIRouter()
 
 
+def room_state(room_manager: RoomManager, room_id: str) -> dict:
+    """Payload of the `state` reply: the room's current bots."""
+    bots = []
+    for b in room_manager.ensure_room(room_id).bots.values():
+        bots.append({
+            "id": b.id,
+            "name": b.personality.name,
+            "avatar": getattr(b, 'avatar', '🤖'),
+            "persona": {
+                "stance": b.personality.stance,
+                "domain": b.personality.domain,
+            },
+        })
+    return {"bots": bots}
+
+
 def get_manager(websocket: WebSocket) -> ConnectionManager:
     # Access the globally created manager from app.state in main.py
     return websocket.app.state.ws_manager  # type: ignore[attr-defined]
@@ -29,8 +46,10 @@ async def websocket_room_endpoint(
 ) -> None:
     await manager.connect(roomId, websocket)
     try:
+        # Route this room's cross-worker events here while sockets are connected
+        await bus.claim_room(roomId)
         # Optional: greet the client
-        await websocket.send_json({"event": "ready", "payload": {"roomId": roomId}})
+        await manager.send_to(websocket, {"event": "ready", "payload": {"roomId": roomId}})
         # Client->server messages: handle client_transcript (room-aware)
         while True:
             raw = await websocket.receive_text()
@@ -63,26 +82,32 @@ async def websocket_room_endpoint(
                         await bus.publish("bot:join", {"roomId": roomId, "bot": bot})
                 except Exception:
                     pass
+            elif event in ("subscribe", "unsubscribe") and isinstance(payload.get("events"), list):
+                # Opt in/out of optional events (e.g. "reaction_partial") for this connection
+                events = [e for e in payload.get("events", []) if isinstance(e, str)]
+                manager.set_opt_in(websocket, events, enabled=event == "subscribe")
             elif event == "state_request":
                 # Return current bots in room to the requesting client only
+                if not bus.holds_room_state(roomId):
+                    # The bots live on another worker: it answers through
+                    # bot:state, addressed to this connection (see main.py)
+                    await bus.publish("bot:state_request", {
+                        "roomId": roomId,
+                        "connectionId": manager.connection_id(websocket),
+                    })
+                    continue
                 try:
-                    room = websocket.app.state.room_manager.ensure_room(roomId)  # type: ignore[attr-defined]
-                    bots = []
-                    for b in room.bots.values():
-                        bots.append({
-                            "id": b.id,
-                            "name": b.personality.name,
-                            "avatar": getattr(b, 'avatar', '🤖'),
-                            "persona": {
-                                "stance": b.personality.stance,
-                                "domain": b.personality.domain,
-                            },
-                        })
-                    await websocket.send_json({"event": "state", "payload": {"bots": bots}})
+                    state = room_state(websocket.app.state.room_manager, roomId)  # type: ignore[attr-defined]
+                    await manager.send_to(websocket, {"event": "state", "payload": state})
                 except Exception:
-                    await websocket.send_json({"event": "state", "payload": {"bots": []}})
+                    await manager.send_to(websocket, {"event": "state", "payload": {"bots": []}})
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Any exit (disconnect or error) drops the socket and stops its writer
         manager.disconnect(roomId, websocket)
+        if not manager.has_sockets(roomId):
+            await bus.release_room(roomId)
 
 
 @router.websocket("/ws/transcript/{roomId}")
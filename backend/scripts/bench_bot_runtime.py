@@ -0,0 +1,115 @@
+"""Microbenchmark of the runtime bot representation.
+
+Compares the `__slots__` Bot/BotPersona/BotState used by the reaction loop
+with equivalent pydantic models (the previous representation, defined
+below as the baseline) on:
+
+- alloc:  building one bot (persona + state + bot)
+- read:   the attribute reads of one reaction cycle (stance, domain,
+          cooldown, probability, last reaction time, score)
+- cycle:  one full reaction cycle on a bot (reads, lastReactionTs and
+          engagementScore writes, history appends)
+
+    cd backend
+    python scripts/bench_bot_runtime.py [--number 200000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import timeit
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Deque, Literal, Tuple
+
+from pydantic import BaseModel, Field
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.bot import Bot, BotPersona, BotState  # noqa: E402
+
+
+class PydanticPersona(BaseModel):
+    name: str
+    stance: Literal["supportive", "skeptical", "curious"]
+    domain: Literal["tech", "design", "finance"]
+    description: str
+
+
+class PydanticState(BaseModel):
+    engagementScore: float = 10.0
+    present: bool = True
+    memory: Deque[str] = Field(default_factory=lambda: deque(maxlen=32))
+    engagementHistory: Deque[Tuple[float, float]] = Field(default_factory=lambda: deque(maxlen=32))
+    lastReactionTs: float = 0.0
+    cooldownSeconds: float = 3.0
+    reactionProbability: float = 1.0
+    recentEmojis: Deque[str] = Field(default_factory=lambda: deque(maxlen=32))
+    recentPhrases: Deque[str] = Field(default_factory=lambda: deque(maxlen=32))
+
+
+class PydanticBot(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    avatar: str
+    personality: PydanticPersona
+    state: PydanticState
+
+
+PERSONA = {"name": "bench", "stance": "curious", "domain": "tech", "description": "Benchmark audience member."}
+
+
+def _alloc_slots():
+    return Bot(avatar="🤖", personality=BotPersona(**PERSONA), state=BotState())
+
+
+def _alloc_pydantic():
+    return PydanticBot(avatar="🤖", personality=PydanticPersona(**PERSONA), state=PydanticState())
+
+
+def _read(bot) -> float:
+    p, s = bot.personality, bot.state
+    return (len(p.stance) + len(p.domain) + s.cooldownSeconds + s.reactionProbability
+            + s.lastReactionTs + s.engagementScore)
+
+
+def _cycle(bot, now: float = 100.0) -> None:
+    p, s = bot.personality, bot.state
+    if now - s.lastReactionTs >= s.cooldownSeconds and p.stance:
+        s.lastReactionTs = now
+    s.engagementScore = min(10.0, s.engagementScore + 1.0)
+    s.recentEmojis.append("🙂")
+    s.recentPhrases.append("ok")
+    s.engagementHistory.append((now, s.engagementScore))
+
+
+def _best_ns(stmt, number: int, repeat: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<8} {'slots ns':>10} {'pydantic ns':>12} {'speedup':>8}")
+    slots_bot, pyd_bot = _alloc_slots(), _alloc_pydantic()
+    cases = [
+        # Allocation is slower, so fewer iterations
+        ("alloc", _alloc_slots, _alloc_pydantic, max(1, args.number // 10)),
+        ("read", lambda: _read(slots_bot), lambda: _read(pyd_bot), args.number),
+        ("cycle", lambda: _cycle(slots_bot), lambda: _cycle(pyd_bot), args.number),
+    ]
+    for name, fast, slow, number in cases:
+        a = _best_ns(fast, number, args.repeat)
+        b = _best_ns(slow, number, args.repeat)
+        print(f"{name:<8} {a:>10.1f} {b:>12.1f} {b / a:>7.2f}x")
+    print(
+        f"size     {sys.getsizeof(slots_bot.state):>9}B {sys.getsizeof(pyd_bot.state) + sys.getsizeof(pyd_bot.state.__dict__):>11}B"
+        "  (BotState object, excluding buffers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
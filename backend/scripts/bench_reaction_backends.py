@@ -0,0 +1,119 @@
+"""Latency benchmark for the stage-2 reaction backends.
+
+Runs the same transcript chunks through each backend via Bot.generateReaction
+and reports per-call latency. The remote backend is only included with
+--remote (it needs OPENROUTER_API_KEY and spends real quota).
+
+    cd backend
+    python scripts/bench_reaction_backends.py [--calls 200] [--concurrency 16] [--mock-latency 0] [--remote]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.metrics import quantile  # noqa: E402
+from app.services.bot import Bot, BotPersona, BotState  # noqa: E402
+from app.services.reaction_backends import (  # noqa: E402
+    LocalReactionBackend,
+    MockReactionBackend,
+    RemoteReactionBackend,
+    ReactionBackend,
+    set_reaction_backend,
+)
+
+CHUNKS = [
+    "We shipped the new benchmark today and latency dropped by half!",
+    "Is there a roadmap for the enterprise tier?",
+    "Honestly the last release was a regression and caused an outage.",
+    "Let me walk you through the architecture slide.",
+    "Our revenue grew forty percent quarter over quarter.",
+]
+STANCES = ("supportive", "skeptical", "curious")
+DOMAINS = ("tech", "design", "finance")
+
+
+def _bots(count: int):
+    return [
+        Bot(
+            avatar="🤖",
+            personality=BotPersona(
+                name=f"bench{i}",
+                stance=STANCES[i % 3],
+                domain=DOMAINS[(i // 3) % 3],
+                description="Benchmark audience member.",
+            ),
+            state=BotState(),
+        )
+        for i in range(count)
+    ]
+
+
+async def _run(backend: ReactionBackend, calls: int, concurrency: int, stream: bool) -> dict:
+    set_reaction_backend(backend)
+    backend.warm()
+    bots = _bots(15)
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        bot = bots[i % len(bots)]
+        chunk = CHUNKS[i % len(CHUNKS)]
+        async with sem:
+            started = time.perf_counter()
+            result = await bot.generateReaction(
+                chunk, timeout_s=10.0, on_partial=(lambda fields: None) if stream else None
+            )
+            latencies.append(time.perf_counter() - started)
+            if not result:
+                failures += 1
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    wall = time.perf_counter() - wall
+    await backend.close()
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": 1000 * quantile(ordered, 0.5),
+        "p95_ms": 1000 * quantile(ordered, 0.95),
+        "mean_ms": 1000 * statistics.fmean(ordered),
+        "calls_per_s": calls / wall if wall else float("inf"),
+        "failures": failures,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mock-latency", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="request streamed completions")
+    parser.add_argument("--remote", action="store_true", help="also benchmark the remote API")
+    args = parser.parse_args()
+
+    cases = [
+        ("local", LocalReactionBackend()),
+        ("mock", MockReactionBackend(latency_s=args.mock_latency)),
+    ]
+    if args.remote:
+        cases.append(("remote", RemoteReactionBackend()))
+
+    print(f"{'backend':<8} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'calls/s':>10} {'fail':>5}")
+    for name, backend in cases:
+        r = await _run(backend, args.calls, args.concurrency, args.stream)
+        print(
+            f"{name:<8} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['mean_ms']:>9.3f}"
+            f" {r['calls_per_s']:>10.0f} {r['failures']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
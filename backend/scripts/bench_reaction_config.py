@@ -0,0 +1,68 @@
+"""Startup-time benchmark: importing reaction_config.py vs loading the artifact.
+
+Each case runs in a fresh interpreter so nothing is cached in-process.
+
+    cd backend
+    python scripts/bench_reaction_config.py [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.reaction_data import build_artifact  # noqa: E402
+
+# Stdlib modules the app imports anyway (pydantic/fastapi pull them in); loaded
+# before timing so each case measures only the reaction config load itself.
+PRELUDE = "import dataclasses, pickle, pathlib, typing, time;"
+
+CASES = {
+    # No .pyc available (cold container / read-only FS): parse + compile + exec
+    "source (no .pyc)": PRELUDE + (
+        "t = time.perf_counter();"
+        "src = open('app/services/reaction_config.py', encoding='utf-8').read();"
+        "exec(compile(src, 'reaction_config.py', 'exec'), {'__name__': 'rc'});"
+        "print(time.perf_counter() - t)"
+    ),
+    # Warm .pyc: unmarshal the cached bytecode and execute the literal
+    "source (.pyc)": PRELUDE + (
+        "t = time.perf_counter();"
+        "import app.services.reaction_config;"
+        "print(time.perf_counter() - t)"
+    ),
+    "artifact": PRELUDE + (
+        "t = time.perf_counter();"
+        "from app.services.reaction_data import get_reaction_data; get_reaction_data();"
+        "print(time.perf_counter() - t)"
+    ),
+}
+
+
+def _run(code: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    build_artifact()
+    # Prime the .pyc cache for the warm case
+    _run("import app.services.reaction_config; print(0)")
+    print(f"{'case':<18} {'median ms':>10} {'min ms':>8}")
+    for name, code in CASES.items():
+        samples = [_run(code) * 1000 for _ in range(runs)]
+        print(f"{name:<18} {statistics.median(samples):>10.2f} {min(samples):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Microbenchmark of WebSocket broadcast encoding as room fan-out grows.
+
+Broadcasts a typical `reaction` envelope to 1..500 in-memory sockets and
+reports the time per broadcast for:
+
+- per_socket:  each socket encodes its own copy (send_json per socket, as
+               Starlette does; the previous behaviour)
+- json_once:   encoded once with the stdlib encoder, same text to every socket
+- manager:     ConnectionManager.broadcast_json (encoded once with
+               orjson when installed, stdlib json otherwise)
+
+Sends are no-ops, so the numbers are encode + dispatch overhead only; for
+the manager that is encode + enqueue, since per-connection writer tasks
+send in the background. The
+encode columns isolate the serialization work per broadcast: N stdlib
+encodes (per socket) versus one `encode_json` call.
+
+    cd backend
+    python scripts/bench_ws_broadcast.py [--viewers 1,10,50,100,250,500] [--rounds 200]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ws import manager as ws_manager  # noqa: E402
+from app.ws.manager import ConnectionManager, encode_json  # noqa: E402
+
+ROOM_ID = "bench"
+MESSAGE = {
+    "event": "reaction",
+    "payload": {
+        "roomId": ROOM_ID,
+        "botId": "5b0e3c3e-8f43-4a4f-9d3b-1f6e2c9a7d10",
+        "reaction": {"emoji_unicode": "🔥", "micro_phrase": "Love that benchmark!", "score_delta": 2},
+        "late": False,
+    },
+}
+
+
+class NullSocket:
+    """Accepts frames without doing I/O; send_json encodes like Starlette."""
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        pass
+
+    async def send_json(self, data: object) -> None:
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+
+async def _per_socket(sockets, message) -> None:
+    await asyncio.gather(*(ws.send_json(message) for ws in sockets))
+
+
+async def _json_once(sockets, message) -> None:
+    text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+    await asyncio.gather(*(ws.send_text(text) for ws in sockets))
+
+
+def _encode_us(n: int, rounds: int) -> tuple:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for _ in range(n):
+            json.dumps(MESSAGE, separators=(",", ":"), ensure_ascii=False)
+    per_socket = (time.perf_counter() - started) / rounds * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        encode_json(MESSAGE)
+    once = (time.perf_counter() - started) / rounds * 1e6
+    return per_socket, once
+
+
+async def _time_us(fn, rounds: int) -> float:
+    await fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--viewers", default="1,10,50,100,250,500")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    encoder = "orjson" if ws_manager.orjson is not None else "json"
+    print(f"manager encoder: {encoder}")
+    print(
+        f"{'viewers':>7} {'encode N us':>12} {'encode 1 us':>12}"
+        f" {'per_socket us':>14} {'json_once us':>13} {'manager us':>11} {'speedup':>8}"
+    )
+    for n in (int(v) for v in args.viewers.split(",")):
+        sockets = [NullSocket() for _ in range(n)]
+        manager = ConnectionManager(tick_s=0, max_queue=args.rounds * 2)
+        for ws in sockets:
+            await manager.connect(ROOM_ID, ws)  # type: ignore[arg-type]
+        per_socket = await _time_us(lambda: _per_socket(sockets, MESSAGE), args.rounds)
+        once = await _time_us(lambda: _json_once(sockets, MESSAGE), args.rounds)
+        managed = await _time_us(lambda: manager.broadcast_json(ROOM_ID, MESSAGE), args.rounds)
+        enc_n, enc_1 = _encode_us(n, args.rounds)
+        print(
+            f"{n:>7} {enc_n:>12.1f} {enc_1:>12.2f}"
+            f" {per_socket:>14.1f} {once:>13.1f} {managed:>11.1f} {per_socket / managed:>7.2f}x"
+        )
+        await manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
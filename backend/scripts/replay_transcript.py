@@ -0,0 +1,187 @@
+"""Replay a recorded transcript through the reaction pipeline deterministically.
+
+Every reaction decision (suppression, stage-1/stage-2 plan, release
+schedule, probability gates, phrase picks, cache jitter) is drawn from the
+room's seeded RNG, cooldowns run on a simulated clock, and stage 2 uses an
+offline backend, so the same transcript and seed always take the same
+decision path. Use it to compare performance run to run: the printed
+digest must match, only the timings may differ.
+
+The transcript is either plain text (one chunk per line) or JSONL with
+{"text": ..., "t": seconds from start (optional), "flush_meta": {...} (optional)}.
+
+    cd backend
+    python scripts/replay_transcript.py talk.jsonl [--seed 7] [--bots 15] [--runs 2] [--backend local|mock]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.events.bus import EventBus  # noqa: E402
+from app.services.bot import Bot, BotPersona, BotState  # noqa: E402
+from app.services.chunk_analysis import analyze_chunk  # noqa: E402
+from app.services.reaction_backends import (  # noqa: E402
+    LocalReactionBackend,
+    MockReactionBackend,
+    set_reaction_backend,
+)
+from app.services.reaction_cache import ReactionCache  # noqa: E402
+from app.services.reaction_pipeline import DEBUG_EVENT, ReactionPipeline  # noqa: E402
+from app.services.reaction_scheduler import ReactionScheduler  # noqa: E402
+from app.state.room_manager import RoomManager  # noqa: E402
+
+ROOM_ID = "replay"
+STANCES = ("supportive", "skeptical", "curious")
+DOMAINS = ("tech", "design", "finance")
+
+
+class SimClock:
+    """Pipeline clock set to each chunk's recorded time."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingSockets:
+    """Stands in for ConnectionManager: every socket opted in to reaction_debug,
+    whose payloads are recorded off the bus."""
+
+    def __init__(self) -> None:
+        self.decisions: List[Dict[str, Any]] = []
+
+    def has_opt_in(self, room_id: str, event: str) -> bool:
+        return event == DEBUG_EVENT
+
+    async def record(self, payload: Dict[str, Any]) -> None:
+        self.decisions.append(payload)
+
+
+def load_transcript(path: Path, interval_s: float) -> List[Dict[str, Any]]:
+    chunks = []
+    for i, line in enumerate(path.read_text(encoding="utf-8").splitlines()):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            item = json.loads(line)
+        else:
+            item = {"text": line}
+        item.setdefault("t", len(chunks) * interval_s)
+        item.setdefault("flush_meta", {})
+        chunks.append(item)
+    return chunks
+
+
+def _bots(count: int) -> List[Bot]:
+    # Fixed ids and personas so decision records line up across runs
+    return [
+        Bot(
+            id=f"bot-{i:02d}",
+            avatar="🤖",
+            personality=BotPersona(
+                name=f"replay{i}",
+                stance=STANCES[i % 3],
+                domain=DOMAINS[(i // 3) % 3],
+                description="Replay audience member.",
+            ),
+            state=BotState(),
+        )
+        for i in range(count)
+    ]
+
+
+async def replay(chunks: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    backend = LocalReactionBackend() if args.backend == "local" else MockReactionBackend()
+    set_reaction_backend(backend)
+    backend.warm()
+
+    rooms = RoomManager()
+    rooms.set_category(ROOM_ID, args.category)
+    rooms.seed_room(ROOM_ID, args.seed)
+    for bot in _bots(args.bots):
+        rooms.add_bot_to_room(ROOM_ID, bot)
+    clock = SimClock()
+    sockets = RecordingSockets()
+    bus = EventBus()
+    bus.subscribe("bot:reaction_debug", sockets.record)
+    pipeline = ReactionPipeline(
+        rooms,
+        sockets,  # type: ignore[arg-type]
+        bus,
+        ReactionScheduler(window_s=args.window, room_llm_concurrency=4),
+        cache=ReactionCache(),
+        # Hedging races wall-clock latency, which would break determinism
+        hedge_quantile=None,
+        partial_events=False,
+        clock=clock,
+    )
+
+    trace = []
+    latencies = []
+    for n, chunk in enumerate(chunks):
+        clock.now = float(chunk["t"])
+        tail = rooms.get_transcript_tail_chars(ROOM_ID, 150)
+        features = analyze_chunk(chunk["text"], chunk["flush_meta"], rooms.get_category(ROOM_ID))
+        started = time.perf_counter()
+        await pipeline.run(ROOM_ID, features, tail)
+        latencies.append(time.perf_counter() - started)
+        await bus.drain()
+        for d in sorted(sockets.decisions, key=lambda d: (d["botId"], d["decision"]["source"])):
+            r = d["reaction"]
+            trace.append([n, d["botId"], d["decision"]["source"], r.get("emoji_unicode"), r.get("micro_phrase")])
+        sockets.decisions.clear()
+    await pipeline.close()
+    await bus.close()
+    await backend.close()
+
+    digest = hashlib.sha256(json.dumps(trace, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return {
+        "digest": digest,
+        "reactions": len(trace),
+        "bots_left": args.bots - len(rooms.get_service_bots_in_room(ROOM_ID)),
+        "chunk_p50_ms": 1000 * statistics.median(latencies) if latencies else 0.0,
+        "total_s": sum(latencies),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("transcript", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bots", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--backend", choices=("local", "mock"), default="local")
+    parser.add_argument("--category", default="technical_pitch")
+    parser.add_argument("--window", type=float, default=0.3, help="release window per chunk (s)")
+    parser.add_argument("--interval", type=float, default=4.0, help="simulated seconds between chunks without 't'")
+    args = parser.parse_args()
+
+    chunks = load_transcript(args.transcript, args.interval)
+    digests = set()
+    print(f"{'run':<4} {'digest':<17} {'reactions':>9} {'left':>5} {'p50 ms':>9} {'total s':>8}")
+    for run in range(args.runs):
+        r = await replay(chunks, args)
+        digests.add(r["digest"])
+        print(
+            f"{run:<4} {r['digest']:<17} {r['reactions']:>9} {r['bots_left']:>5}"
+            f" {r['chunk_p50_ms']:>9.1f} {r['total_s']:>8.2f}"
+        )
+    if args.runs > 1:
+        print("deterministic:", "yes" if len(digests) == 1 else "NO (decision paths differ)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,41 @@ let transcriptRoomId: string | null = null;
 
 type MessageHandler = (data: any) => void;
 const handlers = new Set<MessageHandler>();
+// Opt-in server events (e.g. "reaction_partial"); re-sent on every connect
+const optInEvents = new Set<string>();
+
+// The server closes slow consumers with 1013 (try again later); reconnect
+// with jittered exponential backoff and resync the room state
+const SLOW_CONSUMER_CLOSE_CODE = 1013;
+const RECONNECT_BASE_MS = 500;
+const RECONNECT_MAX_MS = 10000;
+let reconnectAttempts = 0;
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+
+function cancelReconnect(): void {
+  if (reconnectTimer) clearTimeout(reconnectTimer);
+  reconnectTimer = null;
+}
+
+function scheduleReconnect(roomId: string): void {
+  cancelReconnect();
+  const backoff = Math.min(
+    RECONNECT_MAX_MS,
+    RECONNECT_BASE_MS * 2 ** reconnectAttempts
+  );
+  reconnectAttempts += 1;
+  reconnectTimer = setTimeout(async () => {
+    reconnectTimer = null;
+    try {
+      await wsClient.connect(roomId);
+      reconnectAttempts = 0;
+      // Frames were dropped while we lagged: ask for the current bots
+      wsClient.sendJson({ event: "state_request", payload: {} });
+    } catch {
+      scheduleReconnect(roomId);
+    }
+  }, backoff * (0.5 + Math.random() / 2));
+}
 
 function getWsBase(): string {
   const apiBase = process.env.NEXT_PUBLIC_BACKEND_URL as string;
@@ -30,6 +65,7 @@ export const wsClient = {
     ) {
       return;
     }
+    cancelReconnect();
     // Close any existing
     try {
       socket?.close();
@@ -56,22 +92,39 @@ export const wsClient = {
     });
 
     if (!socket) return;
+    const opened = socket;
     socket.onmessage = (evt) => {
       try {
         const data = JSON.parse(String(evt.data));
-        handlers.forEach((h) => {
-          try {
-            h(data);
-          } catch {}
+        // Batched frames are an array of { event, payload } envelopes
+        const messages = Array.isArray(data) ? data : [data];
+        messages.forEach((msg) => {
+          handlers.forEach((h) => {
+            try {
+              h(msg);
+            } catch {}
+          });
         });
       } catch {
         // ignore malformed
       }
     };
-    socket.onclose = () => {
+    socket.onclose = (evt) => {
+      // A newer connection already replaced this one
+      if (socket !== opened) return;
+      const closedRoomId = currentRoomId;
       socket = null;
       currentRoomId = null;
+      if (evt.code === SLOW_CONSUMER_CLOSE_CODE && closedRoomId) {
+        scheduleReconnect(closedRoomId);
+      }
     };
+    if (optInEvents.size > 0) {
+      this.sendJson({
+        event: "subscribe",
+        payload: { events: Array.from(optInEvents) },
+      });
+    }
   },
   isConnected(): boolean {
     return Boolean(
@@ -96,11 +149,21 @@ export const wsClient = {
     if (meta && typeof meta === "object") payload.meta = meta;
     this.sendJson({ event: "client_transcript", payload });
   },
+  optIn(events: string[]): void {
+    events.forEach((e) => optInEvents.add(e));
+    this.sendJson({ event: "subscribe", payload: { events } });
+  },
+  optOut(events: string[]): void {
+    events.forEach((e) => optInEvents.delete(e));
+    this.sendJson({ event: "unsubscribe", payload: { events } });
+  },
   subscribe(handler: MessageHandler): () => void {
     handlers.add(handler);
     return () => handlers.delete(handler);
   },
   disconnect(): void {
+    cancelReconnect();
+    reconnectAttempts = 0;
     try {
       socket?.close();
     } catch {}